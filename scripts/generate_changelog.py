@@ -1,9 +1,31 @@
 #!/usr/bin/env python3
 import os
 import re
+import shutil
+import tempfile
 import subprocess
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Iterable, Iterator
+
+COMMIT_CATEGORIES = {
+    "feat": "Features",
+    "fix": "Bug Fixes",
+    "docs": "Documentation",
+    "perf": "Performance",
+    "refactor": "Refactoring",
+}
+
+COMMIT_PATTERN = re.compile(
+    r"^(?:(?P<feat>feat)|(?P<fix>fix)|(?P<docs>docs)|(?P<perf>perf)"
+    r"|(?P<refactor>refactor))(?:\(.*\))?:",
+    re.IGNORECASE,
+)
+
+COPY_BUFFER_SIZE = 64 * 1024
+PIPE_BUFFER_SIZE = 64 * 1024
+
+# git-side equivalent of COMMIT_PATTERN, used to filter commits at the source
+COMMIT_GREP = r"^(feat|fix|docs|perf|refactor)(\(.*\))?:"
 
 
 def run_git_command(command: List[str]) -> str:
@@ -14,23 +36,43 @@ def run_git_command(command: List[str]) -> str:
         return ""
 
 
-def get_commits_since_last_tag() -> List[str]:
-    """Retrieve commits since the last tagged version."""
+def stream_git_command(command: List[str]) -> Iterator[str]:
+    """Run a git command and yield its output line by line."""
+    with subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        bufsize=PIPE_BUFFER_SIZE,
+    ) as process:
+        for line in process.stdout:
+            yield line.rstrip("\n")
+
+
+def get_commits_since_last_tag(conventional_only: bool = False) -> Iterator[str]:
+    """Retrieve commits since the last tagged version.
+
+    Merge commits are skipped. When conventional_only is set, git itself filters
+    out commits that do not follow the conventional commit prefixes.
+    """
     # Get the last tag
     last_tag = run_git_command(["git", "describe", "--tags", "--abbrev=0"])
 
+    command = ["git", "log", "--no-merges", "--pretty=format:%s"]
     # If no tag exists, get all commits
-    if not last_tag:
-        commits = run_git_command(["git", "log", "--pretty=format:%s"])
-    else:
-        commits = run_git_command(
-            ["git", "log", f"{last_tag}..HEAD", "--pretty=format:%s"]
-        )
+    if last_tag:
+        command.append(f"{last_tag}..HEAD")
+    if conventional_only:
+        command += [
+            "--extended-regexp",
+            "--regexp-ignore-case",
+            f"--grep={COMMIT_GREP}",
+        ]
 
-    return commits.split("\n")
+    return stream_git_command(command)
 
 
-def categorize_commits(commits: List[str]) -> Dict[str, List[str]]:
+def categorize_commits(commits: Iterable[str]) -> Dict[str, List[str]]:
     """Categorize commits into different sections."""
     categories = {
         "Features": [],
@@ -41,61 +83,69 @@ def categorize_commits(commits: List[str]) -> Dict[str, List[str]]:
         "Other": [],
     }
 
-    commit_patterns = [
-        (r"^feat(\(.*\))?:", "Features"),
-        (r"^fix(\(.*\))?:", "Bug Fixes"),
-        (r"^docs(\(.*\))?:", "Documentation"),
-        (r"^perf(\(.*\))?:", "Performance"),
-        (r"^refactor(\(.*\))?:", "Refactoring"),
-    ]
-
     for commit in commits:
-        categorized = False
-        for pattern, category in commit_patterns:
-            if re.match(pattern, commit.lower()):
-                categories[category].append(commit.strip())
-                categorized = True
-                break
-
-        if not categorized:
+        match = COMMIT_PATTERN.match(commit)
+        if match:
+            categories[COMMIT_CATEGORIES[match.lastgroup]].append(commit.strip())
+        else:
             categories["Other"].append(commit.strip())
 
     return {k: v for k, v in categories.items() if v}
 
 
-def generate_changelog(version: str = None) -> str:
-    """Generate a comprehensive changelog."""
+def generate_changelog(version: str = None, conventional_only: bool = False) -> str:
+    """Generate a comprehensive changelog.
+
+    When conventional_only is set, the "Other" section is left out.
+    """
+    now = datetime.now()
     if not version:
         # Use current date if no version provided
-        version = datetime.now().strftime("v0.1.0-%Y%m%d")
+        version = now.strftime("v0.1.0-%Y%m%d")
 
-    commits = get_commits_since_last_tag()
+    commits = get_commits_since_last_tag(conventional_only)
     categorized_commits = categorize_commits(commits)
+    if conventional_only:
+        # git --grep matches any message line, only subjects are categorized
+        categorized_commits.pop("Other", None)
 
-    changelog = (
-        f"# Changelog\n\n## {version} - {datetime.now().strftime('%Y-%m-%d')}\n\n"
-    )
+    parts = [f"# Changelog\n\n## {version} - {now.strftime('%Y-%m-%d')}\n\n"]
 
     for category, commits in categorized_commits.items():
         if commits:
-            changelog += f"### {category}\n"
-            for commit in commits:
-                changelog += f"- {commit}\n"
-            changelog += "\n"
+            parts.append(f"### {category}\n")
+            parts.extend(f"- {commit}\n" for commit in commits)
+            parts.append("\n")
 
-    return changelog
+    return "".join(parts)
 
 
 def write_changelog(changelog: str, filename: str = "CHANGELOG.md"):
-    """Write changelog to file, preserving existing content."""
-    try:
-        with open(filename, "r") as f:
-            existing_content = f.read()
-    except FileNotFoundError:
-        existing_content = ""
-
-    with open(filename, "w") as f:
-        f.write(changelog + "\n" + existing_content)
+    """Write changelog to file, preserving existing content.
+
+    The existing content is streamed after the new entry into a temporary file
+    which then atomically replaces the changelog.
+    """
+    if not os.path.exists(filename):
+        with open(filename, "w") as f:
+            f.write(changelog + "\n")
+        return
+
+    entry = (changelog + "\n").replace("\n", os.linesep).encode()
+    directory = os.path.dirname(os.path.abspath(filename))
+    with tempfile.NamedTemporaryFile(
+        "wb", dir=directory, prefix=".changelog-", delete=False
+    ) as tmp:
+        try:
+            tmp.write(entry)
+            with open(filename, "rb") as f:
+                shutil.copyfileobj(f, tmp, COPY_BUFFER_SIZE)
+            shutil.copymode(filename, tmp.name)
+        except BaseException:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+    os.replace(tmp.name, filename)
 
 
 def main():
@@ -8,22 +8,38 @@ Usage: python version_increment.py [patch|minor|major]
 
 import os
 import sys
+import shutil
+import tempfile
 import subprocess
 import re
 
+VERSION_MARKER = "__version__"
+VERSION_PATTERN = re.compile(r'__version__\s*=\s*[\'"].*[\'"]')
 
-def update_version_in_file(filepath, new_version):
-    """Update version in a specific file."""
-    with open(filepath, "r") as f:
-        content = f.read()
-
-    # Replace version string
-    updated_content = re.sub(
-        r'__version__\s*=\s*[\'"].*[\'"]', f'__version__ = "{new_version}"', content
-    )
 
-    with open(filepath, "w") as f:
-        f.write(updated_content)
+def update_version_in_file(filepath, new_version):
+    """Update version in a specific file.
+
+    Lines are streamed to a temporary file which then atomically replaces the
+    original, the pattern is only applied to lines mentioning __version__.
+    """
+    replacement = f'__version__ = "{new_version}"'
+    directory = os.path.dirname(os.path.abspath(filepath))
+    with tempfile.NamedTemporaryFile(
+        "w", dir=directory, prefix=".version-", delete=False, newline=""
+    ) as tmp:
+        try:
+            with open(filepath, "r", newline="") as f:
+                for line in f:
+                    if VERSION_MARKER in line:
+                        line = VERSION_PATTERN.sub(replacement, line)
+                    tmp.write(line)
+            shutil.copymode(filepath, tmp.name)
+        except BaseException:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+    os.replace(tmp.name, filepath)
 
 
 def update_changelog(new_version):
@@ -5,8 +5,10 @@ tracking their status and maintaining counters for various processing states.
 """
 
 import os
+import time
 import logging
-from typing import Dict, Optional, Callable, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Callable, Any, Set, Tuple
 
 from medialocate.batch.status import ProcessingStatus
 from medialocate.store.dict import DictStore
@@ -32,7 +34,7 @@ class ActionControler:
     FAILED = "failed"  # number of files processed with error
     DELETED = "deleted"  # number of files deleted
     SAVED = "saved"  # number of files saved
-    _COUNTER_LIST = {
+    _COUNTER_LIST = (
         RECOVERED,
         RECIEVED,
         RECORDED,
@@ -43,30 +45,25 @@ class ActionControler:
         FAILED,
         DELETED,
         SAVED,
-    }
+    )
 
     LOGGER_NAME = "ProcessMemory"
     STATUS_STORE_NAME = "pmstatus.json"
-
-    # Whitelist of allowed shell commands that can be executed with shell=True
-    ALLOWED_SHELL_COMMANDS = {
-        "echo",  # Basic output testing
-        "type",  # Windows equivalent of cat
-        "dir",  # Windows directory listing
-        "copy",  # File copy operations
-        "move",  # File move operations
-        "del",  # File deletion
-        "mkdir",  # Create directory
-        "rmdir",  # Remove directory
-    }
+    BATCH_SIZE = 128  # number of files an action can prepare at once
 
     # instance attributes
     log: logging.Logger
     working_directory: str
+    root_directory: str
     force_option: bool
+    max_workers: int
     store: DictStore
     counters: Dict[str, int]
+    _pending: Dict[str, Any]  # status updates not yet written to the store
+    _outcomes: Tuple[Tuple[ProcessingStatus.State, str], ...]
+    _batch: Dict[str, Tuple[str, ProcessingStatus]]  # files waiting for the action
     action: Callable[[str, str], int]  # Will always be a callable after init
+    prepare: Optional[Callable[[List[str]], None]]
 
     def __init__(
         self,
@@ -74,19 +71,29 @@ class ActionControler:
         action: Optional[Callable[[str, str], int]] = None,
         force_option: bool = False,
         parent_logger: Optional[str] = None,
+        root_directory: str = os.curdir,
+        max_workers: int = 1,
     ) -> None:
         """Initialize the action controller.
 
         Args:
             working_directory: Directory for storing status files
             action: Action to perform on files.
-                    Must be a callable taking (file_path, hash) and returning int
+                    Must be a callable taking (file_path, hash) and returning int.
+                    When it has a prepare method, files to process are queued and
+                    prepare is called with each batch of queued file paths before
+                    the action is performed on them
             force_option: Force processing even if file is older than status
             parent_logger: Parent logger name for hierarchical logging
+            root_directory: Directory the processed file paths are relative to
+            max_workers: Number of threads performing the action on the files of
+                a batch, the action must then be thread safe. Outcomes are still
+                recorded by the calling thread, in the order of the files
         """
-        self.counters = {}
-        for counter in ActionControler._COUNTER_LIST:
-            self.counters[counter] = 0
+        self.counters = dict.fromkeys(ActionControler._COUNTER_LIST, 0)
+
+        self.root_directory = root_directory
+        self.max_workers = max_workers
 
         # Normalize working directory
         self.working_directory = os.path.abspath(working_directory)
@@ -98,10 +105,23 @@ class ActionControler:
             self.working_directory, ActionControler.STATUS_STORE_NAME
         )
         self.store.open()
+        self._pending = {}
+        self._batch = {}
+        ProcessingStatus.migrateStore(self.store)
         self.counters[ActionControler.RECOVERED] = len(self.store)
 
         self.log = logging.getLogger(
-            ".".join(filter(None, [parent_logger, ActionControler.LOGGER_NAME]))
+            f"{parent_logger}.{ActionControler.LOGGER_NAME}"
+            if parent_logger
+            else ActionControler.LOGGER_NAME
+        )
+
+        # state and counter resulting from an action, by return code:
+        # 0 succeeded, 1 to 9 ignored, above 9 failed
+        self._outcomes = (
+            (ProcessingStatus.State.DONE, ActionControler.SUCCEEDED),
+            (ProcessingStatus.State.IGNORE, ActionControler.IGNORED),
+            (ProcessingStatus.State.ERROR, ActionControler.FAILED),
         )
 
         """
@@ -124,6 +144,8 @@ class ActionControler:
             if not callable(action):
                 raise ValueError("Non-shell action must be callable")
             self.action = action
+        prepare = getattr(action, "prepare", None)
+        self.prepare = prepare if callable(prepare) else None
 
     def __enter__(self) -> "ActionControler":
         """Enter the context manager."""
@@ -131,37 +153,79 @@ class ActionControler:
 
     def __exit__(self, *args: Any) -> None:
         """Exit the context manager."""
+        self.flush()
         self.counters[ActionControler.SAVED] = len(self.store)
         self.store.close()
 
+    def flush(self) -> None:
+        """Perform the action on queued files and write pending status updates."""
+        self._process_batch()
+        if self._pending:
+            self.store.update(self._pending)
+            self._pending = {}
+
     def get_counters(self) -> Dict[str, int]:
         """Return the current counter values."""
         return self.counters
 
     def clean(self) -> None:
-        """Clean up resources and reset counters."""
+        """Clean up resources and reset counters.
+
+        Each directory holding recorded files is listed once, rather than
+        checking recorded files one by one.
+        """
+        self.flush()
+        listings: Dict[str, Set[str]] = {}
         to_remove = []
-        for status in ProcessingStatus.getAllFromStore(self.store):
-            if not os.path.isfile(status.getFilename()):
-                to_remove.append(status)
-        for status in to_remove:
-            status.delete()
+        for key, _, filename, _ in ProcessingStatus.getAllRawFromStore(self.store):
+            directory = os.path.dirname(filename) or os.curdir
+            if directory not in listings:
+                listings[directory] = self._list_files(
+                    os.path.join(self.root_directory, directory)
+                )
+            if os.path.basename(filename) not in listings[directory]:
+                to_remove.append(key)
+        for key in to_remove:
+            self.store.pop(key)
             self.counters[ActionControler.DELETED] += 1
 
+    @staticmethod
+    def _list_files(directory: str) -> Set[str]:
+        """Return the names of the regular files found in a directory."""
+        try:
+            with os.scandir(directory) as entries:
+                return {entry.name for entry in entries if entry.is_file()}
+        except OSError:
+            return set()
+
     def drop(self) -> None:
         """Remove all status."""
+        self._batch = {}
+        self._pending = {}
         self.store.clear()
 
-    def process(self, file_to_process: str) -> None:
+    @staticmethod
+    def _get_mtime(filename: str, stat_result: Optional[os.stat_result]) -> float:
+        """Return a file modification time, reusing its stat when known."""
+        if stat_result is not None:
+            return stat_result.st_mtime
+        return os.path.getmtime(filename)
+
+    def process(
+        self, file_to_process: str, stat_result: Optional[os.stat_result] = None
+    ) -> None:
         """Process a file using the configured action.
 
         Args:
             file_to_process: Path to the file to process
+            stat_result: Already known stat of the file, saves a stat call when given
         """
         proceed_action = False
         self.counters[ActionControler.RECIEVED] += 1
 
         key = ProcessingStatus.filename_hash(file_to_process)
+        if key in self._pending or key in self._batch:
+            self.flush()
         status = ProcessingStatus.getFromStore(self.store, key)
 
         if status is None:
@@ -175,7 +239,10 @@ class ActionControler:
             if state == ProcessingStatus.State.DONE:
                 proceed_action = (
                     self.force_option
-                    or os.path.getmtime(file_to_process) > status.getTime()
+                    or self._get_mtime(
+                        os.path.join(self.root_directory, file_to_process), stat_result
+                    )
+                    > status.getTime()
                 )
             elif state == ProcessingStatus.State.ERROR:
                 self.counters[ActionControler.REPAIRED] += 1
@@ -185,15 +252,39 @@ class ActionControler:
 
         if proceed_action:
             self.counters[ActionControler.PROCESSED] += 1
-            rc = self.action(file_to_process, status.key)
-            if rc > 9:
-                status.setState(ProcessingStatus.State.ERROR)
-                self.counters[ActionControler.FAILED] += 1
-            elif rc == 0:
-                status.setState(ProcessingStatus.State.DONE)
-                self.counters[ActionControler.SUCCEEDED] += 1
+            if self.prepare is None:
+                self._record_outcome(status, self.action(file_to_process, status.key))
             else:
-                status.setState(ProcessingStatus.State.IGNORE)
-                self.counters[ActionControler.IGNORED] += 1
+                self._batch[key] = (file_to_process, status)
+                if len(self._batch) >= ActionControler.BATCH_SIZE:
+                    self._process_batch()
+
+    def _process_batch(self) -> None:
+        """Prepare the queued files at once, then perform the action on each."""
+        if not self._batch or self.prepare is None:
+            return
+        batch = list(self._batch.values())
+        self._batch = {}
+        files = [file_to_process for file_to_process, _ in batch]
+        keys = [status.key for _, status in batch]
+        self.prepare(files)
+        if self.max_workers > 1 and len(batch) > 1:
+            workers = min(self.max_workers, len(batch))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                rcs = list(executor.map(self.action, files, keys))
+        else:
+            rcs = list(map(self.action, files, keys))
+        # the batch is processed by now, its statuses share one update time
+        now = time.time()
+        for (_, status), rc in zip(batch, rcs):
+            self._record_outcome(status, rc, now)
+
+    def _record_outcome(
+        self, status: ProcessingStatus, rc: int, now: Optional[float] = None
+    ) -> None:
+        """Record the outcome of the action performed on a file."""
+        state, counter = self._outcomes[0 if rc == 0 else 2 if rc > 9 else 1]
+        status.setState(state)
+        self.counters[counter] += 1
 
-            status.update()
+        status.update(self._pending, now)
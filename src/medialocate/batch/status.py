@@ -5,15 +5,29 @@ including their current status, timestamps, and related metadata.
 """
 
 import time
+import functools
 from enum import Enum
-from typing import Iterator, ClassVar, Dict, Any, List, Optional
+from typing import Iterator, ClassVar, Dict, Any, List, Optional, Tuple
 from medialocate.store.dict import DictStore
 from medialocate.util.file_naming import (
     get_hash_from_relative_path,
+    get_legacy_hash_from_relative_path,
+    is_legacy_hash_migrated,
+    mark_legacy_hash_migrated,
     relative_path_to_posix,
 )
 
 
+# memoized on the raw filename string, see ProcessingStatus.filename_hash
+_cached_hash_from_relative_path = functools.lru_cache(maxsize=65536)(
+    get_hash_from_relative_path
+)
+# statuses of a same file are built several times, from the finder and the store
+_cached_relative_path_to_posix = functools.lru_cache(maxsize=65536)(
+    relative_path_to_posix
+)
+
+
 class ProcessingStatus:
     """Manages the processing status of a file in the batch system.
 
@@ -35,11 +49,26 @@ class ProcessingStatus:
             return self.value
 
         @classmethod
-        def values(cls) -> List[str]:
-            """Get list of all state values as strings."""
-            return [state.value for state in cls]
+        @functools.lru_cache(maxsize=None)
+        def values(cls) -> Tuple[str, ...]:
+            """Get all state values as strings, computed once."""
+            return tuple(state.value for state in cls)
+
+    # one instance per file, no per instance __dict__
+    __slots__ = (
+        "store",
+        "key",
+        "filename",
+        "state",
+        "time",
+        "_isNew",
+        "_isUpdated",
+    )
 
     # class attributes
+    _state_by_value: ClassVar[Dict[str, State]] = {
+        state.value: state for state in State
+    }
     _state_key: ClassVar[str] = "state"
     _filename_key: ClassVar[str] = "filename"
     _time_key: ClassVar[str] = "time"
@@ -69,7 +98,7 @@ class ProcessingStatus:
         """
         self.store = store
         self.key = key
-        self.filename = relative_path_to_posix(filename)
+        self.filename = _cached_relative_path_to_posix(filename)
         self.state = state
         self.time = time_val if time_val is not None else time.time()
         self._isNew = True
@@ -79,8 +108,12 @@ class ProcessingStatus:
 
     @classmethod
     def filename_hash(cls, filename: str) -> str:
-        """Compute the hash of a file name."""
-        return get_hash_from_relative_path(filename)
+        """Compute the hash of a file name.
+
+        Results are memoized on the filename string, so files seen again during
+        a run (or in later runs within the same process) are not rehashed.
+        """
+        return _cached_hash_from_relative_path(filename)
 
     @classmethod
     def getFromStore(
@@ -102,7 +135,7 @@ class ProcessingStatus:
             status = cls(
                 store,
                 key,
-                cls.State(dict_data[cls._state_key]),
+                cls._state_by_value[dict_data[cls._state_key]],
                 dict_data[cls._filename_key],
                 dict_data[cls._time_key],
             )
@@ -123,17 +156,48 @@ class ProcessingStatus:
         Yields:
             ProcessingStatus instances
         """
+        state_by_value = cls._state_by_value
+        state_key = cls._state_key
+        filename_key = cls._filename_key
+        time_key = cls._time_key
         for key, dict_data in store.items():
             status = cls(
                 store,
                 key,
-                cls.State(dict_data[cls._state_key]),
-                dict_data[cls._filename_key],
-                dict_data[cls._time_key],
+                state_by_value[dict_data[state_key]],
+                dict_data[filename_key],
+                dict_data[time_key],
             )
             status._isNew = False
             yield status
 
+    @classmethod
+    def getAllRawFromStore(
+        cls,
+        store: DictStore,
+    ) -> Iterator[Tuple[str, State, str, float]]:
+        """Retrieve the fields of all ProcessingStatus instances from storage.
+
+        Lighter than getAllFromStore for read only scans, no instance is built.
+
+        Args:
+            store: Storage manager
+
+        Yields:
+            Key, state, filename and time of each ProcessingStatus instance
+        """
+        state_by_value = cls._state_by_value
+        state_key = cls._state_key
+        filename_key = cls._filename_key
+        time_key = cls._time_key
+        for key, dict_data in store.items():
+            yield (
+                key,
+                state_by_value[dict_data[state_key]],
+                dict_data[filename_key],
+                dict_data[time_key],
+            )
+
     @classmethod
     def deleteAll(cls, store: DictStore) -> None:
         """Remove all ProcessingStatus instances from storage.
@@ -143,6 +207,33 @@ class ProcessingStatus:
         """
         store.clear()
 
+    @classmethod
+    def migrateStore(cls, store: DictStore) -> int:
+        """Re-key ProcessingStatus instances recorded under legacy MD5 hashes.
+
+        The store is marked once migrated, later calls return without scanning it.
+        A new or empty store holds no legacy keys, it is not marked.
+
+        Args:
+            store: Storage manager
+
+        Returns:
+            Number of migrated ProcessingStatus instances
+        """
+        store_path = store.get_path()
+        if len(store) == 0 or is_legacy_hash_migrated(store_path):
+            return 0
+        migrated = 0
+        for key, dict_data in list(store.items()):
+            filename = dict_data[cls._filename_key]
+            if key == get_legacy_hash_from_relative_path(filename):
+                store.pop(key)
+                store.set(cls.filename_hash(filename), dict_data)
+                migrated += 1
+        store.sync()
+        mark_legacy_hash_migrated(store_path)
+        return migrated
+
     # instance methods
 
     def getFilename(self) -> str:
@@ -171,17 +262,27 @@ class ProcessingStatus:
         if not self._isNew:
             self.store.pop(self.key)
 
-    def update(self) -> None:
-        """Update this ProcessingStatus instance in storage."""
+    def update(
+        self, pending: Optional[Dict[str, Any]] = None, now: Optional[float] = None
+    ) -> None:
+        """Update this ProcessingStatus instance in storage.
+
+        Args:
+            pending: Optional buffer collecting updates to be written to storage
+                     later in bulk, the store is updated right away when omitted
+            now: Optional update time shared by a batch of updates, the current
+                 time is taken when omitted
+        """
         if self._isUpdated or self._isNew:
-            self.time = time.time()
-            self.store.set(
-                self.key,
-                {
-                    self._state_key: self.state.value,
-                    self._filename_key: self.filename,
-                    self._time_key: self.time,
-                },
-            )
+            self.time = time.time() if now is None else now
+            value = {
+                self._state_key: self.state.value,
+                self._filename_key: self.filename,
+                self._time_key: self.time,
+            }
+            if pending is None:
+                self.store.set(self.key, value)
+            else:
+                pending[self.key] = value
             self._isNew = False
             self._isUpdated = False
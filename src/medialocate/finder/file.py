@@ -5,7 +5,8 @@ based on various criteria such as extensions, age, and depth.
 """
 
 import os
-from typing import Iterator
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional, Tuple
 
 
 class FileFinder:
@@ -17,32 +18,45 @@ class FileFinder:
 
     # instance variables
     root_path: str
-    root_depth: int
-    extensions: tuple[str, ...]
-    matches: list[str]
-    excluded_directories: list[str]
+    extensions: frozenset[str]
+    matches: frozenset[str]
+    excluded_directories: frozenset[str]
     min_age: float
     max_depth: int
+    new_files_only: bool
+    relative_paths: bool
+    stat_workers: int
     counters: dict
 
     def __init__(
         self: "FileFinder",
         root_path: str,
-        extensions: list[str] = [],
-        matches: list[str] = [],
-        prune: list[str] = [],
+        extensions: Iterable[str] = (),
+        matches: Iterable[str] = (),
+        prune: Iterable[str] = (),
         min_age: float = 0,
         max_depth: int = -1,
+        new_files_only: bool = False,
+        relative_paths: bool = False,
+        stat_workers: int = 1,
     ) -> None:
         """Initialize a new FileFinder instance.
 
         Args:
             root_path: Base directory to start the search
-            extensions: List of file extensions to filter by (case insensitive)
-            matches: List of exact filenames to match
-            prune: List of directory names to exclude from search
+            extensions: File extensions to filter by (case insensitive),
+                matched against the last suffix of file names
+            matches: Exact filenames to match
+            prune: Directory names to exclude from search
             min_age: Minimum age of files to include (unix timestamp)
             max_depth: Maximum directory depth to search (-1 for unlimited)
+            new_files_only: With min_age, ignore the files of directories not
+                modified since min_age, whose entries have not changed since then.
+                Files modified in place in such directories are then missed.
+            relative_paths: Yield file paths relative to root_path
+            stat_workers: Number of threads getting the age of the files of a
+                directory with min_age, so that storage handles several stat
+                calls at once
 
         Raises:
             FileNotFoundError: If root_path is not a directory
@@ -51,12 +65,17 @@ class FileFinder:
             raise FileNotFoundError(f"Path '{root_path}' is not a directory")
 
         self.root_path = root_path
-        self.root_depth = len(self.root_path.split(os.sep))
-        self.extensions = tuple([e.lower() for e in extensions])
-        self.matches = matches
-        self.excluded_directories = prune
+        # sets for constant time lookups while filtering directory entries
+        self.extensions = frozenset(
+            e.lower() if e.startswith(".") else f".{e.lower()}" for e in extensions
+        )
+        self.matches = frozenset(matches)
+        self.excluded_directories = frozenset(prune)
         self.min_age = min_age
         self.max_depth = max_depth
+        self.new_files_only = new_files_only
+        self.relative_paths = relative_paths
+        self.stat_workers = stat_workers
         self.counters = {
             "dirs": 0,
             "files": 0,
@@ -71,43 +90,143 @@ class FileFinder:
 
         Recursively searches through the directory structure starting at root_path,
         applying all configured filters (extensions, age, depth, etc).
+        Directories are read with os.scandir, so file types come from the directory
+        listing and only files passing the name filters are stat'ed for their age.
+        Pruned directories and directories beyond max_depth are not entered, and
+        symbolic links to directories are not followed.
 
         Yields:
-            str: Full path to each matching file
+            str: Full path to each matching file, or its path relative to root_path
+                when relative_paths is set
         """
-        for root, _, files in os.walk(self.root_path):
-            path_elements = root.split(os.sep)
-            curent_depth = len(path_elements) - self.root_depth
-            depth_overflows = curent_depth > self.max_depth
-
-            if path_elements[-1] in self.excluded_directories or (
-                self.max_depth >= 0 and depth_overflows
-            ):
+        for path, _ in self.find_with_stat():
+            yield path
+
+    def find_with_stat(
+        self: "FileFinder",
+    ) -> Iterator[Tuple[str, Optional[os.stat_result]]]:
+        """Find files matching the configured criteria along with their stat.
+
+        Same as find, files are stat'ed only to filter them by age: their stat is
+        given when min_age is set, so that callers do not stat them again.
+
+        Yields:
+            tuple: Path to each matching file, as yielded by find, and its stat,
+                None when min_age is not set
+        """
+        if self.min_age == 0 or self.stat_workers <= 1:
+            yield from self._find(None)
+            return
+        with ThreadPoolExecutor(self.stat_workers) as executor:
+            yield from self._find(executor)
+
+    def _find(
+        self: "FileFinder", executor: Optional[Executor]
+    ) -> Iterator[Tuple[str, Optional[os.stat_result]]]:
+        """Find files matching the configured criteria, see find_with_stat.
+
+        Args:
+            executor: Executor getting the age of files, None to get it in turn
+
+        Yields:
+            tuple: Path to each matching file and its stat when already known
+        """
+        if os.path.basename(self.root_path) in self.excluded_directories:
+            return
+
+        # depth first, top-down, as os.walk does
+        skip_unchanged = self.new_files_only and self.min_age != 0
+        # entry paths are built by joining root_path, directory names and file name
+        prefix_length = (
+            len(os.path.join(self.root_path, "")) if self.relative_paths else 0
+        )
+        stack: list[tuple[str, int, Optional[os.DirEntry]]] = [
+            (self.root_path, 0, None)
+        ]
+        while stack:
+            directory, curent_depth, directory_entry = stack.pop()
+            unchanged = False
+            if skip_unchanged:
+                try:
+                    directory_stat = (
+                        os.stat(directory)
+                        if directory_entry is None
+                        else directory_entry.stat()
+                    )
+                    unchanged = directory_stat.st_mtime <= self.min_age
+                except OSError:
+                    pass
+            try:
+                with os.scandir(directory) as it:
+                    entries = list(it)
+            except OSError:
                 continue
 
             self.counters["dirs"] += 1
             self.counters["depth"] = max(curent_depth, self.counters["depth"])
 
-            self.counters["files"] += len(files)
-            filtered_files = [
-                f
-                for f in files
-                if not self.extensions or f.lower().endswith(self.extensions)
-            ]
-            filtered_files = [
-                f
-                for f in filtered_files
-                if self.min_age == 0
-                or os.path.getmtime(os.path.join(root, f)) > self.min_age
-            ]
-            filtered_files = [
-                f for f in filtered_files if not self.matches or f in self.matches
-            ]
+            subdirectories = []
+            candidates = []
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    if not entry.is_symlink():
+                        subdirectories.append(entry)
+                    continue
+                self.counters["files"] += 1
+                if unchanged:
+                    continue
+                name = entry.name
+                if self.extensions:
+                    dot = name.rfind(".")
+                    if dot < 0 or name[dot:].lower() not in self.extensions:
+                        continue
+                if self.matches and name not in self.matches:
+                    continue
+                candidates.append(entry)
+            if self.min_age != 0:
+                if executor is not None and len(candidates) > 1:
+                    stats = executor.map(FileFinder._get_stat, candidates)
+                else:
+                    stats = map(FileFinder._get_stat, candidates)
+                filtered_files = [
+                    (entry.path[prefix_length:], entry_stat)
+                    for entry, entry_stat in zip(candidates, stats)
+                    if entry_stat is not None and entry_stat.st_mtime > self.min_age
+                ]
+            else:
+                filtered_files = [
+                    (entry.path[prefix_length:], None) for entry in candidates
+                ]
             self.counters["found"] += len(filtered_files)
 
             # yield the filtered files
-            for file in filtered_files:
-                yield os.path.join(root, file)
+            yield from filtered_files
+
+            if self.max_depth < 0 or curent_depth < self.max_depth:
+                stack.extend(
+                    (entry.path, curent_depth + 1, entry)
+                    for entry in reversed(subdirectories)
+                    if entry.name not in self.excluded_directories
+                )
+
+    @staticmethod
+    def _get_stat(entry: os.DirEntry) -> Optional[os.stat_result]:
+        """Get the stat of a directory entry.
+
+        Args:
+            entry: Directory entry
+
+        Returns:
+            Stat of the entry, or None when it cannot be read
+        """
+        try:
+            return entry.stat()
+        except OSError:
+            return None
 
     def get_counters(self: "FileFinder") -> dict:
         """Get statistics about the file search operation.
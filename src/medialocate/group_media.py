@@ -5,10 +5,14 @@ helping organize media collections by geographic proximity.
 """
 
 import os
+import re
 import json
+import stat
 import glob
 import logging
 import argparse
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
 from medialocate.store.dict import DictStore
 from medialocate.media.location_grouping import MediaGroups
 from medialocate.media.parameters import (
@@ -17,6 +21,19 @@ from medialocate.media.parameters import (
     MEDIAGROUPS_STORE_NAME,
 )
 
+# media groups files start with the grouping threshold, see MediaGroups.write_json
+GROUPS_HEADER_SIZE = 64
+GROUPS_HEADER_PATTERN = re.compile(r'\s*\{\s*"grouping_threshold"\s*:\s*([^,}\s]+)')
+
+
+def configure_logging() -> None:
+    """Configure the logging of the tool, in the main and the worker processes."""
+    logging.basicConfig(
+        format="%(asctime)s : %(levelname)-8s : %(name)s : %(message)s",
+        level=logging.NOTSET,
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
 
 def get_directories(names: list[str]) -> set[str]:
     """Get a set of directory paths from a list of names.
@@ -30,13 +47,95 @@ def get_directories(names: list[str]) -> set[str]:
     Returns:
         Set of resolved directory paths
     """
-    directories = set()
     if len(names) == 0:
-        directories.add(os.getcwd())
-    else:
-        for name in names:
-            directories.update(glob.glob(name))
-    return directories
+        return {os.getcwd()}
+    # a same directory reached through several names or links is kept once
+    directories: dict[str, str] = {}
+    for name in names:
+        for path in glob.iglob(name, recursive=False):
+            directories.setdefault(os.path.realpath(path), path)
+    return set(directories.values())
+
+
+def get_recorded_threshold(groups_file_name: str) -> Optional[float]:
+    """Get the grouping threshold recorded in a media groups file.
+
+    Only the header of the file is read, the groups are not parsed.
+
+    Args:
+        groups_file_name: Path to the media groups file
+
+    Returns:
+        Recorded grouping threshold, None if the file does not record one
+    """
+    try:
+        with open(groups_file_name, "r") as groups_file:
+            header = groups_file.readline(GROUPS_HEADER_SIZE)
+        match = GROUPS_HEADER_PATTERN.match(header)
+        if match is None:
+            return None
+        threshold = json.loads(match.group(1))
+    except (OSError, ValueError):
+        return None
+    if isinstance(threshold, bool) or not isinstance(threshold, (int, float)):
+        return None
+    return float(threshold)
+
+
+def _process_directory(
+    directory: str, grouping_threshold: float, force_option: bool
+) -> str:
+    """Group the media of one directory by location proximity.
+
+    Runs in a worker process when several directories are grouped, so the outcome
+    is returned to be logged by the caller.
+
+    Args:
+        directory: Directory holding media location data
+        grouping_threshold: Distance in km below which media are grouped
+        force_option: Group even if the media groups file is up-to-date
+
+    Returns:
+        Message describing the outcome
+    """
+    working_directory = os.path.join(directory, MEDIALOCATION_DIR)
+    input_file_name = os.path.join(working_directory, MEDIALOCATION_STORE_NAME)
+    output_file_name = os.path.join(working_directory, MEDIAGROUPS_STORE_NAME)
+
+    try:
+        working_directory_mode = os.stat(working_directory).st_mode
+    except OSError:
+        return f"{directory} does not exist, ignored"
+    if not stat.S_ISDIR(working_directory_mode):
+        return f"{directory} is not a directory, ignored"
+
+    try:
+        input_mtime = os.stat(input_file_name).st_mtime_ns
+    except OSError:
+        return f"{directory} no location data available, ignored"
+
+    if not force_option:
+        try:
+            output_mtime = os.stat(output_file_name).st_mtime_ns
+        except OSError:
+            output_mtime = None
+        if (
+            output_mtime is not None
+            and output_mtime > input_mtime
+            and get_recorded_threshold(output_file_name) in (None, grouping_threshold)
+        ):
+            return f"{directory} is up-to-date, ignored"
+
+    with DictStore(working_directory, MEDIALOCATION_STORE_NAME) as input_store:
+        locations = input_store.dict()
+        media_groups = MediaGroups(grouping_threshold, [])
+        media_groups.add_locations(locations)
+        with open(output_file_name, "w") as output_file:
+            media_groups.write_json(output_file)
+    return (
+        f"{directory} : grouping {len(locations)} media "
+        f"in {len(media_groups.groups)} groups"
+    )
 
 
 def main():
@@ -67,11 +166,7 @@ def main():
     )
     args = parser.parse_args()
 
-    logging.basicConfig(
-        format="%(asctime)s : %(levelname)-8s : %(name)s : %(message)s",
-        level=logging.NOTSET,
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
+    configure_logging()
     log = logging.getLogger("GroupMediaCommand")
     log.debug(", ".join(f"{arg}={getattr(args, arg)}" for arg in vars(args)))
 
@@ -83,41 +178,22 @@ def main():
 
     log.debug(f"directories={directories}")
 
-    for directory in directories:
-        working_directory = os.path.join(directory, MEDIALOCATION_DIR)
-        input_file_name = os.path.join(working_directory, MEDIALOCATION_STORE_NAME)
-        output_file_name = os.path.join(working_directory, MEDIAGROUPS_STORE_NAME)
-
-        if not os.path.exists(working_directory):
-            log.info(f"{directory} does not exist, ignored")
-            continue
-        elif not os.path.isdir(working_directory):
-            log.info(f"{directory} is not a directory, ignored")
-            continue
-        elif not os.path.exists(input_file_name):
-            log.info(f"{directory} no location data available, ignored")
-            continue
-
-        if (
-            not args.f
-            and os.path.exists(output_file_name)
-            and os.path.getmtime(output_file_name) > os.path.getmtime(input_file_name)
-        ):
-            # TODO: check treshold is also unchanged
-            log.info(f"{directory} is up-to-date, ignored")
-            continue
-
-        with DictStore(working_directory, MEDIALOCATION_STORE_NAME) as input_store:
-            locations = input_store.dict()
-            media_groups = MediaGroups(grouping_threshold, [])
-            media_groups.add_locations(locations)
-            with open(output_file_name, "w") as output_file:
-                d = media_groups.toDict()
-                json.dump(d, output_file, indent=2)
-                log.info(
-                    f"{directory} : grouping {len(locations)} media "
-                    f"in {len(media_groups.groups)} groups"
+    if len(directories) > 1:
+        max_workers = min(len(directories), os.cpu_count() or 1)
+        with ProcessPoolExecutor(
+            max_workers=max_workers, initializer=configure_logging
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _process_directory, directory, grouping_threshold, args.f
                 )
+                for directory in directories
+            ]
+            for future in futures:
+                log.info(future.result())
+    else:
+        for directory in directories:
+            log.info(_process_directory(directory, grouping_threshold, args.f))
 
 
 if __name__ == "__main__":
@@ -8,6 +8,7 @@ import os
 import logging
 import argparse
 import glob
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from medialocate.batch.controler import ActionControler
 from medialocate.finder.file import FileFinder
@@ -21,6 +22,15 @@ EXEC_HOME = os.path.dirname(os.path.abspath(__file__))
 LIB_DIR = os.path.realpath(os.path.join(EXEC_HOME, "../lib"))
 
 
+def configure_logging() -> None:
+    """Configure the logging of the tool, in the main and the worker processes."""
+    logging.basicConfig(
+        format="%(asctime)s : %(levelname)-8s : %(name)s : %(message)s",
+        level=logging.NOTSET,
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+
 def get_directories(names: list[str]) -> set[str]:
     """Get a set of directory paths from a list of names.
 
@@ -33,12 +43,14 @@ def get_directories(names: list[str]) -> set[str]:
     Returns:
         Set of resolved directory paths
     """
-    directories = set()
+    # a same directory reached through several names or links is kept once
+    directories: dict[str, str] = {}
     for name in names:
-        directories.update(glob.glob(name))
+        for path in glob.iglob(name, recursive=False):
+            directories.setdefault(os.path.realpath(path), path)
     if len(directories) == 0:
-        directories.add(os.getcwd())
-    return directories
+        return {os.getcwd()}
+    return set(directories.values())
 
 
 def locate_media(
@@ -49,6 +61,8 @@ def locate_media(
     launch_option: bool = False,
     regenerate_option: bool = False,
     current_directory_only_option: bool = False,
+    new_files_only_option: bool = False,
+    pool_size: int = 1,
 ) -> int:
     """Process media files in a directory to extract GPS location data.
 
@@ -60,70 +74,89 @@ def locate_media(
         launch_option: Launch browser after processing
         regenerate_option: Regenerate all location data
         current_directory_only_option: Only process current directory
+        new_files_only_option: Skip files of directories unchanged since last run
+        pool_size: Number of directories processed concurrently, the workers
+            of the directory are shared with them
 
     Returns:
         0 on success, 1 on error
     """
-    try:
-        new_dir = os.path.normpath(directory.strip())
-        os.chdir(new_dir)
-        log.info(f"working now in directory {os.getcwd()}")
-    except Exception as e:
-        log.error(f"{e} while trying to change curent working directory to {new_dir}")
+    new_dir = os.path.normpath(directory.strip())
+    if not os.path.isdir(new_dir):
+        log.error("%s is not a directory", new_dir)
         return 1
+    log.info("working now in directory %s", os.path.abspath(new_dir))
 
+    # paths are kept relative to the processed directory, the working directory
+    # of the process is left unchanged so that directories can be processed
+    # concurrently
     working_dir = MEDIALOCATION_DIR
+    working_path = os.path.join(new_dir, working_dir)
+
+    # the cores are shared with the directories processed at the same time
+    workers = max(1, (os.cpu_count() or 1) // pool_size)
+    read_workers = max(1, MediaLocateAction.READ_WORKERS // pool_size)
 
     try:
         if regenerate_option:
             result = MediaLocateAction(
-                working_dir, output_file_name
+                working_dir, output_file_name, root_directory=new_dir
             ).create_location_page()
             return 0 if result is not None else 1
         else:
-            if not os.path.exists(working_dir):
-                os.makedirs(working_dir)
+            os.makedirs(working_path, exist_ok=True)
 
             age_limit: float = 0.0
             if not force_option:
                 try:
-                    age_limit = os.path.getmtime(MEDIALOCATION_STORE_PATH)
+                    age_limit = os.path.getmtime(
+                        os.path.join(new_dir, MEDIALOCATION_STORE_PATH)
+                    )
                 except OSError:
                     pass
 
             finder = FileFinder(
-                ".",
+                new_dir,
                 extensions=MediaLocateAction.get_expected_extensions(),
                 prune=[working_dir],
                 min_age=age_limit,
                 max_depth=0 if current_directory_only_option else -1,
+                new_files_only=new_files_only_option,
+                relative_paths=True,
+                stat_workers=workers,
             )
-            with MediaLocateAction(working_dir, output_file_name) as media_action:
+            with MediaLocateAction(
+                working_dir,
+                output_file_name,
+                root_directory=new_dir,
+                read_workers=read_workers,
+            ) as media_action:
                 with ActionControler(
-                    working_dir,
+                    working_path,
                     action=media_action,
                     force_option=force_option,
+                    root_directory=new_dir,
+                    max_workers=workers,
                 ) as controler:
-                    for file in finder.find():
-                        controler.process(file)
+                    for file, stat_result in finder.find_with_stat():
+                        controler.process(file, stat_result)
+                    # files still queued by the controler must be located first
+                    controler.flush()
 
                     page = media_action.create_location_page()
                     if page is not None:
-                        log.info(f"medialocate page created: {page}")
+                        log.info("medialocate page created: %s", page)
                         if launch_option:
                             launch_browser(page)
                     else:
                         log.info("medialocate page not created or updated")
 
+                # finder and controler counters of the directory on one line
+                counters = {**finder.get_counters(), **controler.get_counters()}
                 log.info(
-                    f"{finder.get_counters()}".replace("'", "")
-                    .replace("{", "")
-                    .replace("}", "")
-                )
-                log.info(
-                    f"{controler.get_counters()}".replace("'", "")
-                    .replace("{", "")
-                    .replace("}", "")
+                    "%s: %s",
+                    new_dir,
+                    ", ".join(f"{k}: {v}" for k, v in counters.items()),
                 )
 
     except Exception as e:
@@ -176,6 +209,12 @@ def main():
         action="store_true",
         help="forces file processing even when already being processed",
     )
+    parser.add_argument(
+        "-n",
+        action="store_true",
+        help="only looks for new files, in directories changed since last processing"
+        + "\nfiles modified in place in unchanged directories are not processed",
+    )
     parser.add_argument(
         "-o",
         type=str,
@@ -196,12 +235,7 @@ def main():
     )
     args = parser.parse_args()
 
-    # logging.basicConfig(level = logging.NOTSET)
-    logging.basicConfig(
-        format="%(asctime)s : %(levelname)-8s : %(name)s : %(message)s",
-        level=logging.NOTSET,
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
+    configure_logging()
     log = logging.getLogger("MediaLocateCommand")
     log.debug(", ".join(f"{arg}={getattr(args, arg)}" for arg in vars(args)))
 
@@ -212,10 +246,23 @@ def main():
 
     log.debug(f"directories={directories}")
 
-    cwd = os.getcwd()
-    for directory in directories:
-        locate_media(log, directory, args.o, args.f, args.l, args.r, args.d)
-        os.chdir(cwd)
+    options = (args.o, args.f, args.l, args.r, args.d, args.n)
+    if len(directories) > 1:
+        # directories are independent, each is processed in its own process so
+        # that the python side of the processing is not bound to a single core
+        max_workers = min(len(directories), os.cpu_count() or 1)
+        with ProcessPoolExecutor(
+            max_workers=max_workers, initializer=configure_logging
+        ) as executor:
+            futures = [
+                executor.submit(locate_media, log, directory, *options, max_workers)
+                for directory in directories
+            ]
+            for future in futures:
+                future.result()
+    else:
+        for directory in directories:
+            locate_media(log, directory, *options)
 
     return 0
 
@@ -2,6 +2,6 @@
 
 from typing import List
 
-from medialocate.location.gps import GPS
+from medialocate.location.gps import GPS, LatitudeIndex
 
-__all__: List[str] = ["GPS"]  # Add your public exports here
+__all__: List[str] = ["GPS", "LatitudeIndex"]  # Add your public exports here
@@ -5,8 +5,18 @@ validation, distance calculations, and various geometric operations like
 midpoint and barycenter calculations.
 """
 
-from math import radians, cos, sin, sqrt, atan2, pi
-from typing import Dict, List, Any
+from bisect import bisect_left, bisect_right
+from math import radians, cos, sin, sqrt, atan2, asin, pi
+from typing import Dict, List, Any, Tuple, Union
+
+EARTH_RADIUS = 6371  # heartstone radius in kilometers
+EARTH_DIAMETER = 2 * EARTH_RADIUS
+
+# latitude and longitude in radians along with the latitude cosine
+RadianPoint = Tuple[float, float, float]
+
+# coordinates of a vector from the center of the Earth
+CartesianPoint = Tuple[float, float, float]
 
 
 class GPS:
@@ -18,9 +28,10 @@ class GPS:
     Attributes:
         latitude_: Latitude in degrees (-90 to 90)
         longitude_: Longitude in degrees (-180 to 180)
+        radian_point_: Cached radian point, computed on first use
     """
 
-    __slots__ = ("latitude_", "longitude_")
+    __slots__ = ("latitude_", "longitude_", "radian_point_")
 
     def __init__(self, latitude: float, longitude: float) -> None:
         """Initialize a GPS coordinate.
@@ -33,13 +44,17 @@ class GPS:
             TypeError: If latitude or longitude are not numbers
             ValueError: If coordinates are outside valid ranges
         """
-        if not isinstance(latitude, (int, float)) or not isinstance(
-            longitude, (int, float)
-        ):
-            raise TypeError("Latitude and longitude must be numbers")
-        if -90 <= latitude <= 90 and -180 <= longitude <= 180:
+        # comparing anything but a number raises TypeError, no isinstance
+        # check is needed on the common path
+        try:
+            latitude_valid = -90 <= latitude <= 90
+            longitude_valid = -180 <= longitude <= 180
+        except TypeError:
+            raise TypeError("Latitude and longitude must be numbers") from None
+        if latitude_valid and longitude_valid:
             self.latitude_ = latitude
             self.longitude_ = longitude
+            self.radian_point_ = None
         else:
             raise ValueError("Invalid GPS coordinates")
 
@@ -69,6 +84,21 @@ class GPS:
         """
         return self.longitude_
 
+    @property
+    def radian_point(self) -> RadianPoint:
+        """Get the trigonometric inputs of the coordinate.
+
+        They are computed once and reused by every distance calculation involving
+        this coordinate.
+
+        Returns:
+            Latitude and longitude in radians along with the latitude cosine
+        """
+        if self.radian_point_ is None:
+            phi = radians(self.latitude_)
+            self.radian_point_ = (phi, radians(self.longitude_), cos(phi))
+        return self.radian_point_
+
     def toDict(self) -> Dict[str, float]:
         """Convert GPS coordinates to dictionary format.
 
@@ -89,6 +119,33 @@ class GPS:
         """
         return cls(d["latitude"], d["longitude"])
 
+    def toPair(self) -> List[float]:
+        """Convert GPS coordinates to their compact serialized format.
+
+        Returns:
+            List holding latitude and longitude
+        """
+        return [self.latitude, self.longitude]
+
+    @classmethod
+    def fromPair(cls, pair: Union[List[float], Dict[str, Any]]) -> "GPS":
+        """Create GPS instance from its compact serialized format.
+
+        Dictionaries written by toDict are accepted as well, so that data
+        serialized before the compact format was introduced can still be read.
+
+        Args:
+            pair: List holding latitude and longitude, or dictionary containing
+                'latitude' and 'longitude' keys
+
+        Returns:
+            New GPS instance
+        """
+        if isinstance(pair, dict):
+            return cls.fromDict(pair)
+        latitude, longitude = pair
+        return cls(latitude, longitude)
+
     def distance_to(self, gps: "GPS") -> float:
         """Calculate distance to another GPS coordinate using Haversine formula.
 
@@ -98,18 +155,105 @@ class GPS:
         Returns:
             Distance in kilometers
         """
-        # Haversine formula
-        R = 6371  # heartstone radius in kilometers
-        phi1 = radians(self.latitude)
-        phi2 = radians(gps.latitude)
-        delta_phi = radians(gps.latitude - self.latitude)
-        delta_lambda = radians(gps.longitude - self.longitude)
+        # Haversine formula, squares are products, faster than ** on floats
+        phi1, lambda1, cos_phi1 = self.radian_point
+        phi2, lambda2, cos_phi2 = gps.radian_point
+        sin_half_delta_phi = sin((phi2 - phi1) * 0.5)
+        sin_half_delta_lambda = sin((lambda2 - lambda1) * 0.5)
+
+        a = (
+            sin_half_delta_phi * sin_half_delta_phi
+            + cos_phi1 * cos_phi2 * sin_half_delta_lambda * sin_half_delta_lambda
+        )
+        # a may exceed 1 by rounding near antipodal points
+        return EARTH_DIAMETER * asin(sqrt(min(1.0, a)))  # result in kilometers
+
+    @staticmethod
+    def to_radian_points(gps_list: List["GPS"]) -> List[RadianPoint]:
+        """Precompute the trigonometric inputs of several GPS coordinates.
+
+        Args:
+            gps_list: GPS coordinates
+
+        Returns:
+            Radian points to be passed to indexes_within
+        """
+        return [gps.radian_point for gps in gps_list]
+
+    def indexes_within(
+        self, points: List[RadianPoint], max_distance: float
+    ) -> List[int]:
+        """Find the precomputed points closer than a given distance.
 
-        a = sin(delta_phi / 2) ** 2 + cos(phi1) * cos(phi2) * sin(delta_lambda / 2) ** 2
-        c = 2 * atan2(sqrt(a), sqrt(1 - a))
+        A great circle distance is never shorter than the arc of its latitude
+        difference, and a circle not reaching a pole spans a bounded longitude
+        range, so points too far by latitude or longitude alone are rejected
+        without computing the Haversine formula.
 
-        distance = R * c  # result in kilometers
-        return distance
+        Args:
+            points: Target points, as returned by to_radian_points
+            max_distance: Distance in kilometers, excluded
+
+        Returns:
+            Indexes of the points closer than max_distance
+        """
+        phi1, lambda1, cos_phi1 = self.radian_point
+        max_delta_phi = max_distance / EARTH_RADIUS
+        # the distance grows with the haversine a, compare a to its bound instead
+        # of converting each a to a distance
+        half_max_angle = max_delta_phi / 2
+        max_a = sin(half_max_angle) ** 2 if half_max_angle < pi / 2 else 2.0
+        # unless it reaches a pole, the searched area also spans a bounded
+        # longitude range
+        if max_delta_phi < pi / 2 and sin(max_delta_phi) < cos_phi1:
+            max_delta_lambda = asin(sin(max_delta_phi) / cos_phi1)
+        else:
+            max_delta_lambda = pi
+        indexes = []
+        for i, (phi2, lambda2, cos_phi2) in enumerate(points):
+            if abs(phi2 - phi1) > max_delta_phi:
+                continue
+            delta_lambda = abs(lambda2 - lambda1)
+            if delta_lambda > pi:
+                delta_lambda = 2 * pi - delta_lambda
+            if delta_lambda > max_delta_lambda:
+                continue
+            sin_half_delta_phi = sin((phi2 - phi1) * 0.5)
+            sin_half_delta_lambda = sin((lambda2 - lambda1) * 0.5)
+            a = (
+                sin_half_delta_phi * sin_half_delta_phi
+                + cos_phi1 * cos_phi2 * sin_half_delta_lambda * sin_half_delta_lambda
+            )
+            if a < max_a:
+                indexes.append(i)
+        return indexes
+
+    def to_cartesian(self) -> CartesianPoint:
+        """Get the unit vector pointing from the center of the Earth to the coordinate.
+
+        Returns:
+            x, y and z coordinates of the unit vector
+        """
+        phi, lambda_, cos_phi = self.radian_point
+        return (cos_phi * cos(lambda_), cos_phi * sin(lambda_), sin(phi))
+
+    @classmethod
+    def from_cartesian(cls, x: float, y: float, z: float) -> "GPS":
+        """Create GPS instance from a vector from the center of the Earth.
+
+        The vector needs not be a unit vector, only its direction is used.
+
+        Args:
+            x: x coordinate of the vector
+            y: y coordinate of the vector
+            z: z coordinate of the vector
+
+        Returns:
+            New GPS instance where the vector meets the surface of the Earth
+        """
+        lon_center = atan2(y, x)
+        lat_center = atan2(z, sqrt(x * x + y * y))
+        return cls(lat_center * 180 / pi, lon_center * 180 / pi)
 
     def midpoint_to(self, gps: "GPS") -> "GPS":
         """Calculate midpoint between this and another GPS coordinate.
@@ -120,15 +264,14 @@ class GPS:
         Returns:
             New GPS instance at the midpoint
         """
-        lat1, lon1, lat2, lon2 = map(
-            radians, [self.latitude, self.longitude, gps.latitude, gps.longitude]
-        )
+        lat1, lon1, cos_lat1 = self.radian_point
+        lat2, lon2, cos_lat2 = gps.radian_point
         dlon = lon2 - lon1
 
-        Bx = cos(lat2) * cos(dlon)
-        By = cos(lat2) * sin(dlon)
-        lat_mid = atan2(sin(lat1) + sin(lat2), sqrt((cos(lat1) + Bx) ** 2 + By**2))
-        lon_mid = lon1 + atan2(By, cos(lat1) + Bx)
+        Bx = cos_lat2 * cos(dlon)
+        By = cos_lat2 * sin(dlon)
+        lat_mid = atan2(sin(lat1) + sin(lat2), sqrt((cos_lat1 + Bx) ** 2 + By**2))
+        lon_mid = lon1 + atan2(By, cos_lat1 + Bx)
 
         return GPS(lat_mid * 180 / pi, lon_mid * 180 / pi)
 
@@ -137,13 +280,13 @@ class GPS:
 
         Args:
             gps: Target GPS coordinate
-            weight: Weight factor for the calculation
+            weight: Weight of this coordinate, the target coordinate weighing 1
 
         Returns:
             New GPS instance at the weighted barycenter
         """
-        lat = self.latitude + ((self.latitude - gps.latitude) / (1 + weight))
-        lon = self.longitude + ((self.longitude - gps.longitude) / (1 + weight))
+        lat = self.latitude + ((gps.latitude - self.latitude) / (1 + weight))
+        lon = self.longitude + ((gps.longitude - self.longitude) / (1 + weight))
         return GPS(lat, lon)
 
     @classmethod
@@ -161,18 +304,46 @@ class GPS:
         z = 0.0
 
         for point in points:
-            lat, lon = radians(point.latitude), radians(point.longitude)
-            x += cos(lat) * cos(lon)
-            y += cos(lat) * sin(lon)
-            z += sin(lat)
+            point_x, point_y, point_z = point.to_cartesian()
+            x += point_x
+            y += point_y
+            z += point_z
 
         total = len(points)
-        x /= total
-        y /= total
-        z /= total
+        return cls.from_cartesian(x / total, y / total, z / total)
 
-        lon_center = atan2(y, x)
-        hyp = sqrt(x * x + y * y)
-        lat_center = atan2(z, hyp)
 
-        return cls(lat_center * 180 / pi, lon_center * 180 / pi)
+class LatitudeIndex:
+    """Index of GPS coordinates sorted by latitude for proximity searches.
+
+    Each search only considers the coordinates within the latitude band the
+    searched distance allows, found by bisection, instead of scanning them all.
+    """
+
+    def __init__(self, gps_list: List[GPS]) -> None:
+        """Build the index.
+
+        Args:
+            gps_list: GPS coordinates to index
+        """
+        self.order = sorted(range(len(gps_list)), key=lambda i: gps_list[i].latitude)
+        self.points = GPS.to_radian_points([gps_list[i] for i in self.order])
+        self.latitudes = [phi for phi, _, _ in self.points]
+
+    def indexes_within(self, gps: GPS, max_distance: float) -> List[int]:
+        """Find the indexed coordinates closer than a given distance.
+
+        Args:
+            gps: Searched GPS coordinate
+            max_distance: Distance in kilometers, excluded
+
+        Returns:
+            Indexes in the indexed list of the coordinates closer than max_distance,
+            in ascending order
+        """
+        phi = gps.radian_point[0]
+        max_delta_phi = max_distance / EARTH_RADIUS
+        low = bisect_left(self.latitudes, phi - max_delta_phi)
+        high = bisect_right(self.latitudes, phi + max_delta_phi)
+        found = gps.indexes_within(self.points[low:high], max_distance)
+        return sorted(self.order[low + i] for i in found)
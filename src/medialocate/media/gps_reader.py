@@ -0,0 +1,231 @@
+"""Read GPS coordinates from the usual places of common media formats.
+
+Most pictures hold their GPS data in the Exif segment of a JPEG file, and most
+movies in the user data of an MP4 file. Reading these few bytes directly is
+much faster than running exiftool, which remains used for the other files.
+"""
+
+import re
+import struct
+from typing import BinaryIO, Optional, Tuple
+
+JPEG_FORMATS = frozenset({"jpg", "jpeg"})
+MP4_FORMATS = frozenset({"mp4", "mov", "3gp"})
+
+# JPEG markers
+_SOI = b"\xff\xd8"
+_APP1 = 0xE1
+_SOS = 0xDA
+_EOI = 0xD9
+_EXIF_HEADER = b"Exif\x00\x00"
+
+# TIFF tags
+_GPS_IFD_POINTER = 0x8825
+_GPS_LATITUDE_REF = 1
+_GPS_LATITUDE = 2
+_GPS_LONGITUDE_REF = 3
+_GPS_LONGITUDE = 4
+_IFD_ENTRY_SIZE = 12
+
+# ISO 6709 coordinates of MP4 user data, e.g. "+48.8584+002.2945/"
+_ISO6709_PATTERN = re.compile(rb"([+-]\d+(?:\.\d*)?)([+-]\d+(?:\.\d*)?)")
+
+
+def read_gps(path: str, media_format: str) -> Optional[Tuple[float, float]]:
+    """Read the GPS coordinates of a media file without exiftool.
+
+    Args:
+        path: Path to the media file
+        media_format: Lowercase extension without leading dot
+
+    Returns:
+        Latitude and longitude, or None when they are not found where expected
+    """
+    if media_format in JPEG_FORMATS:
+        reader = read_jpeg_gps
+    elif media_format in MP4_FORMATS:
+        reader = read_mp4_gps
+    else:
+        return None
+    try:
+        with open(path, "rb") as f:
+            return reader(f)
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def read_jpeg_gps(f: BinaryIO) -> Optional[Tuple[float, float]]:
+    """Read the GPS coordinates of the Exif segment of a JPEG file.
+
+    Args:
+        f: JPEG file opened in binary mode
+
+    Returns:
+        Latitude and longitude, or None when not found
+    """
+    if f.read(2) != _SOI:
+        return None
+    while True:
+        header = f.read(4)
+        if len(header) < 4 or header[0] != 0xFF:
+            return None
+        marker = header[1]
+        if marker in (_SOS, _EOI):
+            return None
+        (length,) = struct.unpack(">H", header[2:])
+        if marker == _APP1:
+            segment = f.read(length - 2)
+            if segment.startswith(_EXIF_HEADER):
+                return _read_tiff_gps(segment[len(_EXIF_HEADER) :])
+        else:
+            f.seek(length - 2, 1)
+
+
+def _read_tiff_gps(tiff: bytes) -> Optional[Tuple[float, float]]:
+    """Read the GPS coordinates of TIFF formatted Exif data.
+
+    Args:
+        tiff: Exif data, starting with the TIFF header
+
+    Returns:
+        Latitude and longitude, or None when not found
+    """
+    if tiff[:2] == b"II":
+        order = "<"
+    elif tiff[:2] == b"MM":
+        order = ">"
+    else:
+        return None
+    magic, ifd0_offset = struct.unpack_from(f"{order}HI", tiff, 2)
+    if magic != 42:
+        return None
+
+    gps_entry = _read_ifd(tiff, order, ifd0_offset).get(_GPS_IFD_POINTER)
+    if gps_entry is None:
+        return None
+    (gps_offset,) = struct.unpack(f"{order}I", gps_entry)
+    gps = _read_ifd(tiff, order, gps_offset)
+    if not all(
+        tag in gps
+        for tag in (
+            _GPS_LATITUDE_REF,
+            _GPS_LATITUDE,
+            _GPS_LONGITUDE_REF,
+            _GPS_LONGITUDE,
+        )
+    ):
+        return None
+
+    latitude = _read_degrees(tiff, order, gps[_GPS_LATITUDE])
+    longitude = _read_degrees(tiff, order, gps[_GPS_LONGITUDE])
+    if latitude is None or longitude is None:
+        return None
+    if gps[_GPS_LATITUDE_REF][:1] == b"S":
+        latitude = -latitude
+    if gps[_GPS_LONGITUDE_REF][:1] == b"W":
+        longitude = -longitude
+    return latitude, longitude
+
+
+def _read_ifd(tiff: bytes, order: str, offset: int) -> dict[int, bytes]:
+    """Read the entries of a TIFF image file directory.
+
+    Args:
+        tiff: Exif data, starting with the TIFF header
+        order: struct byte order of the data
+        offset: Offset of the directory in the data
+
+    Returns:
+        Four bytes value or offset of each entry, by tag
+    """
+    (count,) = struct.unpack_from(f"{order}H", tiff, offset)
+    entries = {}
+    for entry_offset in range(
+        offset + 2, offset + 2 + count * _IFD_ENTRY_SIZE, _IFD_ENTRY_SIZE
+    ):
+        (tag,) = struct.unpack_from(f"{order}H", tiff, entry_offset)
+        entries[tag] = tiff[entry_offset + 8 : entry_offset + 12]
+    return entries
+
+
+def _read_degrees(tiff: bytes, order: str, entry: bytes) -> Optional[float]:
+    """Read degrees given by three rationals: degrees, minutes and seconds.
+
+    Args:
+        tiff: Exif data, starting with the TIFF header
+        order: struct byte order of the data
+        entry: Offset of the rationals, as found in the directory entry
+
+    Returns:
+        Decimal degrees, or None for invalid rationals
+    """
+    (offset,) = struct.unpack(f"{order}I", entry)
+    values = struct.unpack_from(f"{order}6I", tiff, offset)
+    if 0 in values[1::2]:
+        return None
+    degrees, minutes, seconds = (
+        values[i] / values[i + 1] for i in range(0, len(values), 2)
+    )
+    return degrees + minutes / 60 + seconds / 3600
+
+
+def read_mp4_gps(f: BinaryIO) -> Optional[Tuple[float, float]]:
+    """Read the GPS coordinates of the moov/udta/©xyz box of an MP4 file.
+
+    Args:
+        f: MP4 file opened in binary mode
+
+    Returns:
+        Latitude and longitude, or None when not found
+    """
+    box = (0, None)
+    for box_type in (b"moov", b"udta", b"\xa9xyz"):
+        box = _find_box(f, box[0], box[1], box_type)
+        if box is None:
+            return None
+    start, end = box
+    f.seek(start)
+    # 16 bits string size and 16 bits language code precede the string
+    value = f.read(end - start)[4:]
+    match = _ISO6709_PATTERN.match(value)
+    if match is None:
+        return None
+    return float(match.group(1)), float(match.group(2))
+
+
+def _find_box(
+    f: BinaryIO, start: int, end: Optional[int], box_type: bytes
+) -> Optional[Tuple[int, Optional[int]]]:
+    """Find a box among the boxes stored in a range of an MP4 file.
+
+    Only box headers are read, the content of the other boxes is skipped.
+
+    Args:
+        f: MP4 file opened in binary mode
+        start: Offset of the first box
+        end: Offset following the last box, None for the end of the file
+        box_type: Four bytes type of the box to find
+
+    Returns:
+        Start and end offsets of the box content, or None when not found
+    """
+    offset = start
+    while end is None or offset + 8 <= end:
+        f.seek(offset)
+        header = f.read(8)
+        if len(header) < 8:
+            return None
+        size, current_type = struct.unpack(">I4s", header)
+        content = offset + 8
+        if size == 1:
+            (size,) = struct.unpack(">Q", f.read(8))
+            content += 8
+        elif size == 0:
+            # the box extends to the end of the file
+            size = f.seek(0, 2) - offset
+        if size < content - offset:
+            return None
+        if current_type == box_type:
+            return content, offset + size
+        offset += size
+    return None
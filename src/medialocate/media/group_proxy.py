@@ -7,8 +7,11 @@ GPS matches, and group location data.
 
 import os
 import json
+import stat
 import time
 import logging
+import functools
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional, Dict, List, Tuple, Any
 from medialocate.media.parameters import (
     MEDIALOCATION_DIR,
@@ -16,10 +19,62 @@ from medialocate.media.parameters import (
     MEDIAGROUPS_STORE_NAME,
     MEDIAGROUPS_STORE_PATH,
 )
-from medialocate.location.gps import GPS
+from medialocate.location.gps import GPS, LatitudeIndex
 from medialocate.media.location_grouping import MediaGroups
 
 
+@functools.lru_cache(maxsize=64)
+def _load_media_groups(path: str, mtime_ns: int, size: int) -> MediaGroups:
+    """Load a media groups store, parsed stores are kept for later calls.
+
+    Args:
+        path: Path to the media groups store
+        mtime_ns: Modification time of the store, a modified store is loaded again
+        size: Size of the store, catches rewrites within the timestamp resolution
+
+    Returns:
+        MediaGroups instance read from the store, shared by the callers
+    """
+    with open(path, "rb") as f:
+        return MediaGroups.fromDict(json.loads(f.read()))
+
+
+def _search_group_proxies(
+    proxies: "MediaProxies",
+    groups_path: str,
+    proxy_threshold: float,
+    force: bool,
+) -> Tuple[str, int, Optional["Proxy"]]:
+    """Search the proxies between media proxies and the groups of a directory.
+
+    Top level function, so that searches can run in worker processes.
+
+    Args:
+        proxies: Media proxies searching for proxies, updated with the result
+        groups_path: Path to media groups data
+        proxy_threshold: Maximum distance for proximity
+        force: Force update regardless of timestamp
+
+    Returns:
+        Name of the groups directory, result of MediaProxies.find_proxies and
+        proxy of the directory
+    """
+    source_path = os.path.join(groups_path, MEDIAGROUPS_STORE_PATH)
+    source_stat = os.stat(source_path)
+    mediagroups = _load_media_groups(
+        source_path, source_stat.st_mtime_ns, source_stat.st_size
+    )
+    name = os.path.basename(os.path.realpath(groups_path))
+    proxy_number = proxies.find_proxies(
+        name,
+        proxy_threshold,
+        mediagroups.get_groups_gps(),
+        source_stat.st_mtime,
+        force,
+    )
+    return name, proxy_number, proxies.proxies.get(name)
+
+
 class Proxy:
     """A proxy representation for location-based media grouping.
 
@@ -34,13 +89,12 @@ class Proxy:
     """
 
     proxy_threshold: float
-    proxy_matches: List[Tuple[GPS, List[GPS]]]
     last_update: float
 
     def __init__(
         self,
         proxy_threshold: float,
-        matches: List[Tuple[GPS, List[GPS]]] = [],
+        matches: Optional[List[Tuple[GPS, List[GPS]]]] = None,
         timestamp: Optional[float] = None,
     ) -> None:
         """Initialize a new Proxy instance.
@@ -51,21 +105,55 @@ class Proxy:
             timestamp: Optional timestamp for last update
         """
         self.proxy_threshold = proxy_threshold
-        self.proxy_matches = matches
+        self.proxy_matches = matches if matches is not None else []
         self.last_update = time.time() if timestamp is None else timestamp
 
+    @property
+    def proxy_matches(self) -> List[Tuple[GPS, List[GPS]]]:
+        """Get the GPS matches.
+
+        The returned list may be modified in place, the serialized matches are
+        dropped and built again by the next toDict call.
+
+        Returns:
+            List of tuples containing a GPS point and its matching points
+        """
+        if self._proxy_matches is None:
+            # matches loaded by fromDict are only built on first use
+            self._proxy_matches = [
+                (GPS.fromPair(gps), [GPS.fromPair(gps) for gps in gps_list])
+                for gps, gps_list in self._serialized_matches
+            ]
+        self._serialized_matches = None
+        return self._proxy_matches
+
+    @proxy_matches.setter
+    def proxy_matches(self, matches: List[Tuple[GPS, List[GPS]]]) -> None:
+        """Replace the GPS matches.
+
+        Args:
+            matches: List of tuples containing a GPS point and its matching points
+        """
+        self._proxy_matches: Optional[List[Tuple[GPS, List[GPS]]]] = matches
+        self._serialized_matches: Optional[List[Any]] = None
+
     def toDict(self) -> Dict[str, Any]:
         """Convert proxy data to dictionary format.
 
+        Matches are serialized once, proxies left unchanged since they were
+        loaded or last saved are not walked again.
+
         Returns:
             Dictionary containing proxy threshold, matches, and timestamp
         """
+        if self._serialized_matches is None:
+            self._serialized_matches = [
+                (gps.toPair(), [gps.toPair() for gps in gps_list])
+                for gps, gps_list in self._proxy_matches
+            ]
         return {
             "proxy_threshold": self.proxy_threshold,
-            "proxy_matches": [
-                (gps.toDict(), [gps.toDict() for gps in gps_list])
-                for gps, gps_list in self.proxy_matches
-            ],
+            "proxy_matches": self._serialized_matches,
             "last_update": self.last_update,
         }
 
@@ -73,20 +161,19 @@ class Proxy:
     def fromDict(cls, d: Dict[str, Any]) -> "Proxy":
         """Create a Proxy instance from dictionary data.
 
+        GPS instances of the matches are not created until the matches are used,
+        unchanged proxies are written back as they were loaded.
+
         Args:
             d: Dictionary containing proxy data
 
         Returns:
             New Proxy instance
         """
-        return Proxy(
-            d["proxy_threshold"],
-            matches=[
-                (GPS.fromDict(gps), [GPS.fromDict(gps) for gps in gps_list])
-                for gps, gps_list in d["proxy_matches"]
-            ],
-            timestamp=d["last_update"],
-        )
+        proxy = Proxy(d["proxy_threshold"], timestamp=d["last_update"])
+        proxy._proxy_matches = None
+        proxy._serialized_matches = d["proxy_matches"]
+        return proxy
 
 
 class MediaProxies:
@@ -107,8 +194,8 @@ class MediaProxies:
     def __init__(
         self,
         label: str,
-        group_locations: List[GPS] = [],
-        proxies: Dict[str, Proxy] = {},
+        group_locations: Optional[List[GPS]] = None,
+        proxies: Optional[Dict[str, Proxy]] = None,
     ) -> None:
         """Initialize a new MediaProxies instance.
 
@@ -118,8 +205,9 @@ class MediaProxies:
             proxies: Dictionary of proxy relationships
         """
         self.label = label
-        self.proxies = proxies
-        self.group_locations = group_locations  # transient field
+        self.proxies = proxies if proxies is not None else {}
+        # transient field
+        self.group_locations = group_locations if group_locations is not None else []
 
     def toDict(self) -> Dict[str, Any]:
         """Convert media proxies data to dictionary format.
@@ -182,19 +270,19 @@ class MediaProxies:
             ):
                 return -1  # gps list unmodified since last proxy search
 
-        proxy = Proxy(proxy_threshold)
+        matches = []
         found_number = 0
+        index = LatitudeIndex(gps_list)
         for one_of_my_group in self.group_locations:
             found = [
-                gps
-                for gps in gps_list
-                if gps.distance_to(one_of_my_group) < proxy_threshold
+                gps_list[i]
+                for i in index.indexes_within(one_of_my_group, proxy_threshold)
             ]
             if found:
-                proxy.proxy_matches.append((one_of_my_group, found))
+                matches.append((one_of_my_group, found))
                 found_number += len(found)
 
-        self.proxies[label] = proxy
+        self.proxies[label] = Proxy(proxy_threshold, matches)
 
         return found_number
 
@@ -228,7 +316,9 @@ class MediaProxiesControler:
         """
         self.working_directory = working_directory
         self.log = logging.getLogger(
-            ".".join(filter(None, [parent_logger, MediaProxiesControler.LOGGER_NAME]))
+            f"{parent_logger}.{MediaProxiesControler.LOGGER_NAME}"
+            if parent_logger
+            else MediaProxiesControler.LOGGER_NAME
         )
         self.proxy_store_name = os.path.join(
             self.working_directory, MEDIAPROXIES_STORE_PATH
@@ -256,34 +346,38 @@ class MediaProxiesControler:
             Exception: If error occurs during data loading
         """
         working_directory = os.path.join(self.working_directory, MEDIALOCATION_DIR)
-        if not os.path.exists(working_directory):
+        # a single stat tells both whether the directory exists and its type
+        try:
+            working_directory_mode = os.stat(working_directory).st_mode
+        except OSError:
             self.log.info(f"{working_directory} does not exist, ignored")
             return
-        elif not os.path.isdir(working_directory):
+        if not stat.S_ISDIR(working_directory_mode):
             self.log.info(f"{working_directory} is not a directory, ignored")
             return
 
         try:
             groups_store = os.path.join(working_directory, MEDIAGROUPS_STORE_NAME)
-            with open(groups_store, "r") as f:
-                media_groups = MediaGroups.fromDict(json.load(f))
+            groups_stat = os.stat(groups_store)
+            media_groups = _load_media_groups(
+                groups_store, groups_stat.st_mtime_ns, groups_stat.st_size
+            )
         except Exception as e:
             raise Exception(f"Error while loading groups store {groups_store}: {e}")
 
-        name = os.path.basename(os.path.realpath(self.working_directory))
-        if not os.path.exists(self.proxy_store_name):
+        # a missing proxy store is only detected by open
+        try:
+            with open(self.proxy_store_name, "rb") as f:
+                self.proxies = MediaProxies.fromDict(json.loads(f.read()))
+        except FileNotFoundError:
+            name = os.path.basename(os.path.realpath(self.working_directory))
             self.log.info(f"{name} no proxy data available, creating new one")
             self.proxies = MediaProxies(name)
-            self.proxies.group_locations = media_groups.get_groups_gps()
-        else:
-            try:
-                with open(self.proxy_store_name, "r") as f:
-                    self.proxies = MediaProxies.fromDict(json.load(f))
-                self.proxies.group_locations = media_groups.get_groups_gps()
-            except Exception as e:
-                raise Exception(
-                    f"Error while loading proxies store {self.proxy_store_name}: {e}"
-                )
+        except Exception as e:
+            raise Exception(
+                f"Error while loading proxies store {self.proxy_store_name}: {e}"
+            )
+        self.proxies.group_locations = media_groups.get_groups_gps()
 
     def commit(self) -> bool:
         """Save proxy data to storage if modified.
@@ -292,8 +386,11 @@ class MediaProxiesControler:
             True if data was saved, False otherwise
         """
         if self.proxies is not None and self.updated:
-            with open(self.proxy_store_name, "w") as f:
-                json.dump(self.proxies.toDict(), f, indent=2)
+            # compact json.dumps goes through the C encoder, json.dump does not
+            data = json.dumps(self.proxies.toDict())
+            # ensure_ascii makes the encoding trivial, the text layer is skipped
+            with open(self.proxy_store_name, "wb") as f:
+                f.write(data.encode("ascii"))
             return True
         return False
 
@@ -314,29 +411,96 @@ class MediaProxiesControler:
             return 0
 
         try:
-            source_path = os.path.join(groups_path, MEDIAGROUPS_STORE_PATH)
-            with open(source_path, "r") as input_file:
-                mediagroups = MediaGroups.fromDict(json.load(input_file))
+            name, proxy_number, _ = _search_group_proxies(
+                self.proxies, groups_path, proxy_threshold, force
+            )
+        except Exception as e:
+            self.log.error(f"Error while loading groups data {groups_path}: {e}")
+            return 0
+        self._log_search(name, proxy_number)
+        return proxy_number
+
+    def find_proxies_batch(
+        self,
+        groups_paths: List[str],
+        proxy_threshold: float,
+        force: bool = False,
+        max_workers: Optional[int] = None,
+    ) -> int:
+        """Find proximate media groups of several directories.
+
+        Directories are searched in worker processes, only the group locations
+        and the previous proxy of a directory are sent along with it.
+
+        Args:
+            groups_paths: Paths to media groups data
+            proxy_threshold: Maximum distance for proximity
+            force: Force update regardless of timestamp
+            max_workers: Maximum number of worker processes, defaults to the
+                         number of CPUs
+
+        Returns:
+            Number of proximate groups found in all directories
+        """
+        if self.proxies is None:
+            return 0
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        max_workers = min(max_workers, len(groups_paths))
+        if max_workers <= 1:
+            return sum(
+                max(0, self.find_proxies(groups_path, proxy_threshold, force))
+                for groups_path in groups_paths
+            )
+
+        found_number = 0
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = []
+            for groups_path in groups_paths:
                 name = os.path.basename(os.path.realpath(groups_path))
-                proxy_number = self.proxies.find_proxies(
-                    name,
+                previous = self.proxies.proxies.get(name)
+                searching = MediaProxies(
+                    self.proxies.label,
+                    self.proxies.group_locations,
+                    {name: previous} if previous is not None else None,
+                )
+                future = executor.submit(
+                    _search_group_proxies,
+                    searching,
+                    groups_path,
                     proxy_threshold,
-                    mediagroups.get_groups_gps(),
-                    os.path.getmtime(source_path),
                     force,
                 )
-                if proxy_number == -1:
-                    self.log.info(
-                        f"{self.proxies.label} : gps list unmodified since last proxy search"
-                    )
-                elif proxy_number == -2:
-                    self.log.info(f"{self.proxies.label} : no proxy search for self")
-                else:
-                    self.updated = True
-                    self.log.info(
-                        f"{self.proxies.label} : find {proxy_number} proxy with {name} "
+                futures.append((groups_path, future))
+            for groups_path, future in futures:
+                try:
+                    name, proxy_number, proxy = future.result()
+                except Exception as e:
+                    self.log.error(
+                        f"Error while loading groups data {groups_path}: {e}"
                     )
-                return proxy_number
-        except Exception as e:
-            self.log.error(f"Error while loading groups data {groups_path}: {e}")
-            return 0
+                    continue
+                if proxy_number >= 0:
+                    self.proxies.proxies[name] = proxy
+                    found_number += proxy_number
+                self._log_search(name, proxy_number)
+        return found_number
+
+    def _log_search(self, name: str, proxy_number: int) -> None:
+        """Log the outcome of a proxy search and flag found proxies for saving.
+
+        Args:
+            name: Name of the searched groups directory
+            proxy_number: Result of MediaProxies.find_proxies
+        """
+        if proxy_number == -1:
+            self.log.info(
+                f"{self.proxies.label} : gps list unmodified since last proxy search"
+            )
+        elif proxy_number == -2:
+            self.log.info(f"{self.proxies.label} : no proxy search for self")
+        else:
+            self.updated = True
+            self.log.info(
+                f"{self.proxies.label} : find {proxy_number} proxy with {name} "
+            )
@@ -5,9 +5,11 @@ It implements clustering algorithms to group nearby media files together, allowi
 organization of media collections by location.
 """
 
+import json
 import logging
-from typing import Optional
-from medialocate.location.gps import GPS
+from math import floor, inf
+from typing import Optional, TextIO
+from medialocate.location.gps import EARTH_RADIUS, GPS, CartesianPoint, RadianPoint
 
 
 class MediaGroups:
@@ -25,28 +27,48 @@ class MediaGroups:
         Attributes:
             gps: GPS coordinates representing the group's location
             media_keys: List of media file identifiers in this group
+            cartesian_sum: Sum of the unit vectors of the media locations, the
+                group's location is its direction
         """
 
         gps: GPS
         media_keys: list[str]
-
-        def __init__(self, gps: GPS, keys: list[str]) -> None:
+        cartesian_sum: CartesianPoint
+
+        def __init__(
+            self,
+            gps: GPS,
+            keys: list[str],
+            cartesian_sum: Optional[CartesianPoint] = None,
+        ) -> None:
             """Initialize a new media group.
 
             Args:
                 gps: GPS coordinates for the group
                 keys: List of media file identifiers
+                cartesian_sum: Sum of the unit vectors of the media locations,
+                    every media is assumed to be located at gps when not given
             """
             self.gps = gps
             self.media_keys = keys
+            if cartesian_sum is None:
+                x, y, z = gps.to_cartesian()
+                count = len(keys)
+                cartesian_sum = (x * count, y * count, z * count)
+            self.cartesian_sum = cartesian_sum
 
         def toDict(self) -> dict:
             """Convert group data to dictionary format.
 
             Returns:
-                Dictionary containing GPS coordinates and media keys
+                Dictionary containing GPS coordinates, media keys and the sum of
+                the media locations unit vectors
             """
-            return {"gps": self.gps.toDict(), "media_keys": self.media_keys}
+            return {
+                "gps": self.gps.toPair(),
+                "media_keys": self.media_keys,
+                "cartesian_sum": list(self.cartesian_sum),
+            }
 
         @classmethod
         def fromDict(cls, d: dict) -> "MediaGroups.Group":
@@ -58,9 +80,10 @@ class MediaGroups:
             Returns:
                 New Group instance
             """
-            gps = GPS.fromDict(d["gps"])
+            gps = GPS.fromPair(d["gps"])
             media_keys = d["media_keys"]
-            return cls(gps, media_keys)
+            cartesian_sum = d.get("cartesian_sum")
+            return cls(gps, media_keys, tuple(cartesian_sum) if cartesian_sum else None)
 
     grouping_threshold: (
         float  # threshold distance to group media locations expressed in km
@@ -93,6 +116,26 @@ class MediaGroups:
             "groups": [group.toDict() for group in self.groups],
         }
 
+    def write_json(self, fp: TextIO) -> None:
+        """Write media groups data to a file in JSON format.
+
+        Writes the same document as json.dumps(self.toDict()), one group at a
+        time, so the whole document is never held in memory.
+
+        Args:
+            fp: File opened for writing text
+        """
+        fp.write(
+            f'{{"grouping_threshold": {json.dumps(self.grouping_threshold)}, '
+            '"groups": ['
+        )
+        separator = ""
+        for group in self.groups:
+            fp.write(separator)
+            fp.write(json.dumps(group.toDict()))
+            separator = ", "
+        fp.write("]}")
+
     @classmethod
     def fromDict(cls, d: dict) -> "MediaGroups":
         """Create a MediaGroups instance from dictionary data.
@@ -112,11 +155,26 @@ class MediaGroups:
         """Add new media locations to existing groups.
 
         Groups media locations based on GPS proximity using the grouping threshold.
-        Updates group barycenters when new locations are added to existing groups.
+        Updates group barycenters when new locations are added to existing groups,
+        a location close to several groups merges them into a single group. Only
+        the groups of nearby latitudes are compared to each location.
 
         Args:
             locations: Dictionary mapping location keys to location data
         """
+        # groups are filed by latitude band, the bands being as high as the
+        # threshold angle, a location can then only be grouped with groups of its
+        # own band and of the two adjacent ones
+        band_height = self.grouping_threshold / EARTH_RADIUS
+        if band_height <= 0:
+            band_height = inf
+        groups = dict(enumerate(self.groups))
+        bands: dict[int, dict[int, RadianPoint]] = {}
+        for group_id, group in groups.items():
+            point = group.gps.radian_point
+            bands.setdefault(floor(point[0] / band_height), {})[group_id] = point
+        next_id = len(groups)
+
         for location_key, location_desc in locations.items():
             try:
                 location_gps = GPS(
@@ -128,24 +186,42 @@ class MediaGroups:
                     f"{location_key}: {e.__class__.__name__} {e}"
                 )
                 continue
-            groups_found = [
-                i
-                for i in range(len(self.groups))
-                if self.groups[i].gps.distance_to(location_gps)
-                < self.grouping_threshold
+            band = floor(location_gps.radian_point[0] / band_height)
+            candidates = [
+                (group_id, point)
+                for neighbour_band in (band - 1, band, band + 1)
+                for group_id, point in bands.get(neighbour_band, {}).items()
             ]
+            groups_found = location_gps.indexes_within(
+                [point for _, point in candidates], self.grouping_threshold
+            )
 
             if groups_found:
-                for i in groups_found:
-                    barycenter = self.groups[i].gps.barycenter_to(
-                        location_gps, len(self.groups[i].media_keys)
-                    )
-                    media_keys = self.groups[i].media_keys.copy()
-                    media_keys.append(location_key)
-                    del self.groups[i]
-                    self.groups.append(MediaGroups.Group(barycenter, media_keys))
+                # the location bridges every group found, merge them all with it,
+                # the barycenter is the direction of the sum of the unit vectors
+                x, y, z = location_gps.to_cartesian()
+                media_keys = []
+                for i in sorted(groups_found, key=lambda i: candidates[i][0]):
+                    group_id, point = candidates[i]
+                    del bands[floor(point[0] / band_height)][group_id]
+                    group = groups.pop(group_id)
+                    group_x, group_y, group_z = group.cartesian_sum
+                    x += group_x
+                    y += group_y
+                    z += group_z
+                    media_keys.extend(group.media_keys)
+                barycenter = GPS.from_cartesian(x, y, z)
+                media_keys.append(location_key)
+                group = MediaGroups.Group(barycenter, media_keys, (x, y, z))
             else:
-                self.groups.append(MediaGroups.Group(location_gps, [location_key]))
+                group = MediaGroups.Group(location_gps, [location_key])
+            point = group.gps.radian_point
+            bands.setdefault(floor(point[0] / band_height), {})[next_id] = point
+            groups[next_id] = group
+            next_id += 1
+
+        # group identifiers follow the order groups are created in
+        self.groups = list(groups.values())
 
     def get_groups_gps(self) -> list[GPS]:
         """Get list of GPS coordinates for all groups.
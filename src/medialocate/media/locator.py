@@ -7,11 +7,15 @@ and media type classification.
 """
 
 import os
+import sys
 import shutil
 import logging
+import threading
 import subprocess  # nosec B404 - subprocess usage is required and secured
+import urllib.parse
 from enum import Enum
-from typing import Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Any, Dict, List, Tuple
 from pathlib import PurePath
 from exiftool import ExifToolHelper  # type: ignore[import-untyped]
 from medialocate.media.parameters import (
@@ -20,9 +24,19 @@ from medialocate.media.parameters import (
     MEDIALOCATION_RES_DIR,
     MEDIALOCATION_PAGE_DATA,
 )
+from medialocate.media.gps_reader import read_gps
 from medialocate.store.dict import DictStore
 from medialocate.location.gps import GPS
-from medialocate.util.file_naming import relative_path_to_uri
+from medialocate.util.file_naming import (
+    relative_path_to_uri,
+    get_hash_from_relative_path,
+    get_legacy_hash_from_relative_path,
+    is_legacy_hash_migrated,
+    mark_legacy_hash_migrated,
+)
+
+# os.sendfile only accepts a regular file as destination on Linux
+_SENDFILE_TO_FILE = sys.platform.startswith("linux")
 
 
 class MediaType(Enum):
@@ -124,7 +138,8 @@ class MediaLocateAction:
     Uses ExifTool for metadata extraction and supports various media formats.
 
     Attributes:
-        working_directory: Base directory for processing
+        working_directory: Base directory for processing, relative to root_directory
+        root_directory: Directory the media and output paths are relative to
         out_file: Output file path
         log: Logger instance
         store: Dictionary store for data
@@ -138,6 +153,12 @@ class MediaLocateAction:
     PROLOG_RESSOURCE_NAME = "prolog.html"
     EPILOG_RESSOURCE_NAME = "epilog.html"
     DATA_APPENDIX_NAME = MEDIALOCATION_STORE_PATH
+    READ_WORKERS = 16
+    STYLESHEET_LINK_TEMPLATE = """<link rel = "stylesheet" href = "{path}">"""
+    SCRIPT_LINK_TEMPLATE = """<script src = "{path}"></script>"""
+    DATA_LINK_TEMPLATE = (
+        """<script type="text/javascript" src="{path}" class="json"></script>"""
+    )
 
     class GPSExtractionError(Exception):
         """Exception raised when GPS data extraction fails.
@@ -152,21 +173,37 @@ class MediaLocateAction:
         working_directory: str,
         outfile: str,
         parent_logger: Optional[str] = None,
+        root_directory: str = os.curdir,
+        read_workers: int = READ_WORKERS,
     ) -> None:
         """Initialize MediaLocateAction instance.
 
         Args:
-            working_directory: Base directory for processing
+            working_directory: Base directory for processing, relative to
+                root_directory
             outfile: Output file path
             parent_logger: Optional parent logger name
+            root_directory: Directory the media and output paths are relative to,
+                links written in the location page stay relative to it
+            read_workers: Maximum number of threads reading media file headers
         """
         self.working_directory = working_directory
+        self.read_workers = read_workers
+        self.root_directory = root_directory
         self.out_file = outfile
         self.log = logging.getLogger(
-            ".".join(filter(None, [parent_logger, MediaLocateAction.LOGGER_NAME]))
+            f"{parent_logger}.{MediaLocateAction.LOGGER_NAME}"
+            if parent_logger
+            else MediaLocateAction.LOGGER_NAME
+        )
+        self.store = DictStore(
+            self._get_path(self.working_directory), MediaLocateAction.STORE_NAME
         )
-        self.store = DictStore(self.working_directory, MediaLocateAction.STORE_NAME)
         self.store.open()
+        # set when the data script must be written again although the store is
+        # saved, once legacy keys and thumbnails have been migrated
+        self.data_outdated = False
+        self._migrate_legacy_keys()
         self.ressources_path = os.path.join(
             os.path.dirname(__file__), MediaLocateAction.RESSOURCE_DIR_NAME
         )
@@ -179,8 +216,19 @@ class MediaLocateAction:
         self.data_appendix_path = os.path.join(
             self.working_directory, MEDIALOCATION_PAGE_DATA
         )
-        self.thrird_party_path: dict[str, str] = {}
+        self.data_link = MediaLocateAction.DATA_LINK_TEMPLATE.format(
+            path=PurePath(self.data_appendix_path).as_posix()
+        )
+        # resource file contents with their modification time, by path
+        self.resources: Dict[str, Tuple[float, str]] = {}
+        self.thrird_party_path: dict[str, Optional[str]] = {}
         self.exiftool: Optional[ExifToolHelper] = None
+        # exiftool runs one command at a time, files may be processed by threads
+        self.exiftool_lock = threading.Lock()
+        # metadata extracted ahead by prepare, by normalized file path
+        self.prepared_metadata: Dict[str, Dict[str, Any]] = {}
+        # location page links of the appendices, by appendix path
+        self.appendix_links: Dict[str, str] = {}
 
     def __call__(self, file_to_process: str, file_status: str) -> int:
         """Process a media file when instance is called as a function.
@@ -212,6 +260,49 @@ class MediaLocateAction:
         """Terminate the action."""
         self.__exit__()
 
+    def _get_path(self, path: str) -> str:
+        """Get the path of a file given relative to the root directory.
+
+        Args:
+            path: File path relative to the root directory
+
+        Returns:
+            File path usable from the current working directory
+        """
+        return os.path.join(self.root_directory, path)
+
+    def _migrate_legacy_keys(self) -> None:
+        """Re-key media data and thumbnails recorded under legacy MD5 hashes.
+
+        The store is marked once migrated, later calls return without scanning it.
+        A new or empty store holds no legacy keys, it is not marked.
+        """
+        store_path = self.store.get_path()
+        if len(self.store) == 0 or is_legacy_hash_migrated(store_path):
+            return
+        for key, data in list(self.store.items()):
+            source = data.get("mediasource")
+            if source is None:
+                continue
+            source = urllib.parse.unquote(source)
+            if key != get_legacy_hash_from_relative_path(source):
+                continue
+            new_key = get_hash_from_relative_path(source)
+            legacy_thumb_filename = os.path.join(self.working_directory, f"{key}.jpg")
+            thumb_filename = os.path.join(self.working_directory, f"{new_key}.jpg")
+            if os.path.exists(self._get_path(legacy_thumb_filename)):
+                os.replace(
+                    self._get_path(legacy_thumb_filename),
+                    self._get_path(thumb_filename),
+                )
+            data["mediathumbnail"] = relative_path_to_uri(thumb_filename)
+            self.store.pop(key)
+            self.store.set(new_key, data)
+            # the location page data still refers to the legacy thumbnails
+            self.data_outdated = True
+        self.store.sync()
+        mark_legacy_hash_migrated(store_path)
+
     def get_gps_data(self, file_to_process: str) -> GPS:
         """Extract GPS coordinates from media file's EXIF data.
 
@@ -224,19 +315,36 @@ class MediaLocateAction:
         Raises:
             GPSExtractionError: If GPS data is missing or invalid
         """
-        # Validate exiftool is installed
-        # Ignore return value, only need side effect of setting thrird_party_path
-        _ = self._get_third_party_path("exiftool")
+        media_format = MediaLocateAction.get_filename_extension(file_to_process)
+        if media_format in MediaLocateAction.gps_less_formats:
+            raise MediaLocateAction.GPSExtractionError(
+                f"No GPS data expected in {media_format} files"
+            )
 
-        if self.exiftool is None:
-            self.exiftool = ExifToolHelper()
+        data = self.prepared_metadata.pop(os.path.normpath(file_to_process), None)
+        if data is None:
+            data = MediaLocateAction.read_gps_data(file_to_process, media_format)
+        if data is None:
+            # Validate exiftool is installed
+            # Ignore return value, only need side effect of setting thrird_party_path
+            _ = self._get_third_party_path("exiftool")
+
+            with self.exiftool_lock:
+                if self.exiftool is None:
+                    self.exiftool = ExifToolHelper()
+                exiftool = self.exiftool
 
         try:
-            metadata = self.exiftool.get_tags(
-                file_to_process, tags=[ExifKey.LATITUDE.value, ExifKey.LONGITUDE.value]
-            )
-            if metadata and len(metadata) > 0:
-                data = metadata[0]
+            if data is None:
+                with self.exiftool_lock:
+                    metadata = exiftool.get_tags(
+                        file_to_process,
+                        tags=[ExifKey.LATITUDE.value, ExifKey.LONGITUDE.value],
+                        params=MediaLocateAction.get_exiftool_params(media_format),
+                    )
+                if metadata and len(metadata) > 0:
+                    data = metadata[0]
+            if data is not None:
                 if ExifKey.LATITUDE.value in data and ExifKey.LONGITUDE.value in data:
                     latitude = float(data[ExifKey.LATITUDE.value])
                     longitude = float(data[ExifKey.LONGITUDE.value])
@@ -252,6 +360,90 @@ class MediaLocateAction:
                 f"Failed to extract GPS data: {str(e)}"
             )
 
+    @staticmethod
+    def read_gps_data(
+        file_to_process: str, media_format: str
+    ) -> Optional[Dict[str, Any]]:
+        """Read GPS data where JPEG and MP4 files usually store it.
+
+        Args:
+            file_to_process: Path to media file
+            media_format: Lowercase extension without leading dot
+
+        Returns:
+            GPS data keyed like exiftool metadata, or None when exiftool is needed
+        """
+        coordinates = read_gps(file_to_process, media_format)
+        if coordinates is None:
+            return None
+        return {
+            ExifKey.LATITUDE.value: coordinates[0],
+            ExifKey.LONGITUDE.value: coordinates[1],
+        }
+
+    def prepare(self, files_to_process: List[str]) -> None:
+        """Extract the GPS data of several media files with a single exiftool call.
+
+        File headers are first read concurrently by read_gps_data. Files whose
+        GPS data is not found there, and needing the same exiftool options, are
+        then extracted together by exiftool. The
+        extracted metadata is then used by get_gps_data. Files are left to
+        get_gps_data, one by one, when the batch extraction fails.
+
+        Args:
+            files_to_process: Paths to media files, relative to the root directory
+        """
+        self.prepared_metadata = {}
+        paths = []
+        media_formats = []
+        for file in files_to_process:
+            media_format = MediaLocateAction.get_filename_extension(file)
+            if media_format not in MediaLocateAction.gps_less_formats:
+                paths.append(self._get_path(file))
+                media_formats.append(media_format)
+
+        # reading file headers mostly waits on storage, reads are overlapped
+        # by threads so that the storage gets several requests at once
+        workers = min(self.read_workers, len(paths))
+        if workers > 1:
+            with ThreadPoolExecutor(workers) as executor:
+                read_data = list(
+                    executor.map(MediaLocateAction.read_gps_data, paths, media_formats)
+                )
+        else:
+            read_data = list(map(MediaLocateAction.read_gps_data, paths, media_formats))
+
+        batches: Dict[Optional[str], List[str]] = {}
+        for path, media_format, data in zip(paths, media_formats, read_data):
+            if data is not None:
+                self.prepared_metadata[os.path.normpath(path)] = data
+            else:
+                params = MediaLocateAction.get_exiftool_params(media_format)
+                batches.setdefault(params, []).append(path)
+
+        if not batches or self._get_third_party_path("exiftool") is None:
+            return
+
+        if self.exiftool is None:
+            self.exiftool = ExifToolHelper()
+
+        for params, paths in batches.items():
+            try:
+                metadata = self.exiftool.get_tags(
+                    paths,
+                    tags=[ExifKey.LATITUDE.value, ExifKey.LONGITUDE.value],
+                    params=params,
+                )
+            except Exception as e:
+                self.log.warning(f"Failed to extract GPS data of a batch of files: {e}")
+                continue
+            # exiftool reports each file under the path it has been given
+            self.prepared_metadata.update(
+                (os.path.normpath(data["SourceFile"]), data)
+                for data in metadata
+                if "SourceFile" in data
+            )
+
     media_types = {
         "3gp": MediaType.MOVIE,
         "avi": MediaType.MOVIE,
@@ -270,6 +462,42 @@ class MediaLocateAction:
         "webp": MediaType.PICTURE,
     }
 
+    expected_extensions = tuple(f".{ext}" for ext in media_types)
+
+    # formats with no standard place for GPS data, exiftool is not even called
+    gps_less_formats = frozenset({"gif", "webm"})
+
+    # -fast2 stops reading pictures once their metadata is found and skips maker
+    # notes, it would also stop at the media data of QuickTime movies, which are
+    # often written before their metadata, so movies are only read with -fast
+    exiftool_params = {
+        MediaType.MOVIE: "-fast",
+        MediaType.PICTURE: "-fast2",
+    }
+
+    # only key frames of movies are decoded to pick the thumbnail among them,
+    # the thumbnail filter is useless on a single picture frame
+    ffmpeg_input_options = {
+        MediaType.MOVIE: ["-skip_frame", "nokey"],
+        MediaType.PICTURE: [],
+    }
+    ffmpeg_filters = {
+        MediaType.MOVIE: "thumbnail,scale=w=128:h=-1",
+        MediaType.PICTURE: "scale=w=128:h=-1",
+    }
+
+    @classmethod
+    def get_exiftool_params(cls, extension: str) -> Optional[str]:
+        """Get the exiftool options used to extract GPS data from a media format.
+
+        Args:
+            extension: Lowercase extension without leading dot
+
+        Returns:
+            exiftool options, or None for unknown formats
+        """
+        return cls.exiftool_params.get(cls.get_media_type(extension))
+
     @classmethod
     def get_expected_extensions(cls) -> list[str]:
         """Get list of supported media file extensions.
@@ -277,7 +505,7 @@ class MediaLocateAction:
         Returns:
             List of supported file extensions with leading dot
         """
-        return [f".{ext}" for ext in cls.media_types.keys()]
+        return list(cls.expected_extensions)
 
     @classmethod
     def get_filename_extension(cls, filename: str) -> str:
@@ -289,7 +517,11 @@ class MediaLocateAction:
         Returns:
             Lowercase extension without leading dot
         """
-        return os.path.splitext(filename)[1][1:].lower()
+        dot = filename.rfind(".")
+        # like os.path.splitext, a dot starting the file name is no extension
+        if dot <= max(filename.rfind("/"), filename.rfind(os.sep)) + 1:
+            return ""
+        return filename[dot + 1 :].lower()
 
     @classmethod
     def get_media_type(cls, extension: str) -> MediaType:
@@ -310,7 +542,8 @@ class MediaLocateAction:
             package_name: Name of the executable to find
 
         Returns:
-            Full path to executable or None if not found
+            Full path to executable or None if not found, the executable is
+            only looked up on the first call
         """
         if package_name in self.thrird_party_path:
             return self.thrird_party_path[package_name]
@@ -326,6 +559,7 @@ class MediaLocateAction:
                     return abs_path
 
             self.log.error(f"{package_name} not found in PATH or not executable")
+            self.thrird_party_path[package_name] = None
             return None
 
         except Exception as e:
@@ -359,6 +593,12 @@ class MediaLocateAction:
             # Ensure output directory exists
             os.makedirs(os.path.dirname(abs_thumbnail), exist_ok=True)
 
+            media_type = MediaLocateAction.get_media_type(
+                MediaLocateAction.get_filename_extension(filename)
+            )
+            if media_type is not MediaType.PICTURE:
+                media_type = MediaType.MOVIE
+
             # Build ffmpeg command with security measures
             result = subprocess.run(  # nosec B603 - command args are validated
                 [
@@ -367,10 +607,11 @@ class MediaLocateAction:
                     "-v",
                     "quiet",
                     "-nostdin",
+                    *MediaLocateAction.ffmpeg_input_options[media_type],
                     "-i",
                     abs_filename,
                     "-vf",
-                    "thumbnail,scale=w=128:h=-1",
+                    MediaLocateAction.ffmpeg_filters[media_type],
                     "-frames:v",
                     "1",
                     abs_thumbnail,
@@ -407,9 +648,16 @@ class MediaLocateAction:
             thumbnail_name: Path to output thumbnail
 
         Returns:
-            True if thumbnail was generated, False otherwise
+            True if thumbnail was generated or is already up to date,
+            False otherwise
         """
         if media_type in [MediaType.MOVIE, MediaType.PICTURE]:
+            # a thumbnail newer than its media is kept, a missing media is left
+            # to generate_thumbnail to report
+            media_mtime = MediaLocateAction._get_mtime(filename)
+            thumbnail_mtime = MediaLocateAction._get_mtime(thumbnail_name)
+            if media_mtime > float("-inf") and thumbnail_mtime >= media_mtime:
+                return True
             return self.generate_thumbnail(filename, thumbnail_name)
         return False
 
@@ -425,19 +673,92 @@ class MediaLocateAction:
         Returns:
             HTML snippet with links to appended files
         """
-        snippet = ""
-        for source in os.listdir(self.ressources_path):
-            if source.endswith(file_extension):
-                target_path = os.path.join(self.working_directory, source)
-                source_path = os.path.join(self.ressources_path, source)
-                snippet += template.format(path=PurePath(target_path).as_posix())
-                if not os.path.exists(target_path) or os.path.getmtime(
-                    target_path
-                ) < os.path.getmtime(source_path):
-                    with open(target_path, "w") as f_out:
-                        with open(source_path, "r") as f_in:
-                            f_out.write(f_in.read())
-        return snippet
+        snippets = []
+        with os.scandir(self.ressources_path) as entries:
+            for entry in entries:
+                if entry.name.endswith(file_extension):
+                    target_link = os.path.join(self.working_directory, entry.name)
+                    target_path = self._get_path(target_link)
+                    posix_link = self.appendix_links.get(target_link)
+                    if posix_link is None:
+                        posix_link = PurePath(target_link).as_posix()
+                        self.appendix_links[target_link] = posix_link
+                    snippets.append(template.format(path=posix_link))
+                    if (
+                        MediaLocateAction._get_mtime(target_path)
+                        < entry.stat().st_mtime
+                    ):
+                        with open(target_path, "w") as f_out:
+                            with open(entry.path, "r") as f_in:
+                                f_out.write(f_in.read())
+        return "".join(snippets)
+
+    @staticmethod
+    def _get_mtime(path: str) -> float:
+        """Get the modification time of a file with a single stat call.
+
+        Args:
+            path: Path to the file
+
+        Returns:
+            Modification time, or minus infinity when the file does not exist
+        """
+        try:
+            return os.stat(path).st_mtime
+        except FileNotFoundError:
+            return float("-inf")
+
+    def write_data_appendix(self) -> None:
+        """Write the location page data script from the store file.
+
+        The store file is streamed into the script, with os.sendfile on Linux,
+        so its content is never loaded in memory.
+        """
+        with open(self._get_path(self.data_appendix_path), "wb") as destination:
+            with open(self.store.get_path(), "rb") as source:
+                destination.write(b"medialocate_data=")
+                offset = 0
+                copied = False
+                if _SENDFILE_TO_FILE:
+                    destination.flush()
+                    size = os.fstat(source.fileno()).st_size
+                    try:
+                        while offset < size:
+                            sent = os.sendfile(
+                                destination.fileno(),
+                                source.fileno(),
+                                offset,
+                                size - offset,
+                            )
+                            if sent == 0:
+                                break
+                            offset += sent
+                        copied = True
+                    except OSError:
+                        # fall back to a plain copy of the remaining content
+                        pass
+                if not copied:
+                    source.seek(offset)
+                    shutil.copyfileobj(source, destination)
+                destination.write(b";")
+
+    def _read_resource(self, path: str, mtime: float) -> str:
+        """Read a resource file, reusing its content while it is not modified.
+
+        Args:
+            path: Path to the resource file
+            mtime: Current modification time of the resource file
+
+        Returns:
+            Content of the resource file
+        """
+        cached = self.resources.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(path, "r") as f:
+            content = f.read()
+        self.resources[path] = (mtime, content)
+        return content
 
     def create_location_page(self) -> Optional[str]:
         """Create location page from processed media data.
@@ -445,57 +766,45 @@ class MediaLocateAction:
         Returns:
             Path to generated location page or None if not created
         """
-        if len(self.store) > 0 and self.store._touched:
+        if len(self.store) > 0 and (self.store._touched or self.data_outdated):
             # copy a fresh version of the stylesheet and script appendices files if needed
-            stylesheet_link_template = """<link rel = "stylesheet" href = "{path}">"""
             html_stylesheet_snippet = (
                 self.copy_location_page_appendices_and_get_associated_html_links(
-                    ".css", stylesheet_link_template
+                    ".css", MediaLocateAction.STYLESHEET_LINK_TEMPLATE
                 )
             )
-            script_link_template = """<script src = "{path}"></script>"""
             html_script_snippet = (
                 self.copy_location_page_appendices_and_get_associated_html_links(
-                    ".js", script_link_template
+                    ".js", MediaLocateAction.SCRIPT_LINK_TEMPLATE
                 )
             )
 
             # generates medialocation data/script appendix file if needed
-            data_link_template = (
-                """<script type="text/javascript" src="{path}" class="json"></script>"""
-            )
-            html_script_snippet += data_link_template.format(
-                path=PurePath(self.data_appendix_path).as_posix()
-            )
-            if self.store._touched:
-                self.store.sync()
-                with open(self.data_appendix_path, "w") as destination:
-                    with open(self.store.get_path(), "r") as source:
-                        destination.write("medialocate_data=")
-                        destination.write(source.read())
-                        destination.write(";")
+            html_script_snippet += self.data_link
+            self.store.sync()
+            self.write_data_appendix()
+            self.data_outdated = False
 
             # generates the location page if needed
-            if (
-                not os.path.exists(self.out_file)
-                or os.path.getmtime(self.out_file)
-                < os.path.getmtime(self.prolog_resource_path)
-                or os.path.getmtime(self.out_file)
-                < os.path.getmtime(self.epilog_resource_path)
-            ):
-                with open(self.out_file, "w") as f:
-                    with open(self.prolog_resource_path, "r") as html_prolog:
-                        html_prolog_template = html_prolog.read()
-                        f.write(
-                            html_prolog_template.format(
-                                stylesheets=html_stylesheet_snippet,
-                                scripts=html_script_snippet,
-                            )
+            out_file = self._get_path(self.out_file)
+            prolog_mtime = os.path.getmtime(self.prolog_resource_path)
+            epilog_mtime = os.path.getmtime(self.epilog_resource_path)
+            if MediaLocateAction._get_mtime(out_file) < max(prolog_mtime, epilog_mtime):
+                html_prolog_template = self._read_resource(
+                    self.prolog_resource_path, prolog_mtime
+                )
+                with open(out_file, "w") as f:
+                    f.write(
+                        html_prolog_template.format(
+                            stylesheets=html_stylesheet_snippet,
+                            scripts=html_script_snippet,
                         )
-                    with open(self.epilog_resource_path, "r") as html_epilog:
-                        f.write(html_epilog.read())
+                    )
+                    f.write(
+                        self._read_resource(self.epilog_resource_path, epilog_mtime)
+                    )
 
-            return self.out_file
+            return out_file
         else:
             return None
 
@@ -503,21 +812,23 @@ class MediaLocateAction:
         """Process a media file to extract and store its metadata.
 
         Args:
-            file_to_process: Path to media file
+            file_to_process: Path to media file, relative to the root directory
             hash: Hash value for media file
 
         Returns:
             0 on success, non-zero on error
         """
         try:
-            gps = self.get_gps_data(file_to_process)
+            gps = self.get_gps_data(self._get_path(file_to_process))
 
             media_format = MediaLocateAction.get_filename_extension(file_to_process)
             media_type = MediaLocateAction.get_media_type(media_format)
             thumb_filename = os.path.join(self.working_directory, f"{hash}.jpg")
 
             if self.create_thumb_from_media(
-                file_to_process, media_type, thumb_filename
+                self._get_path(file_to_process),
+                media_type,
+                self._get_path(thumb_filename),
             ):
                 data_tag = DataTag()
 
@@ -113,24 +113,22 @@ def main(
             elif purge_mode:
                 controler.clean()
                 log.info(
-                    f"{controler.get_counters()}".replace("'", "")
-                    .replace("{", "")
-                    .replace("}", "")
+                    ", ".join(f"{k}: {v}" for k, v in controler.get_counters().items())
                 )
             else:
                 finder = FileFinder(".", prune=[memory_store_location])
-                for file in finder.find():
-                    controler.process(file)
+                for file, stat_result in finder.find_with_stat():
+                    controler.process(file, stat_result)
 
                 log.info(
-                    f"finder: {finder.get_counters()}".replace("'", "")
-                    .replace("{", "")
-                    .replace("}", "")
+                    "finder: "
+                    + ", ".join(f"{k}: {v}" for k, v in finder.get_counters().items())
                 )
                 log.info(
-                    f"controler: {controler.get_counters()}".replace("'", "")
-                    .replace("{", "")
-                    .replace("}", "")
+                    "controler: "
+                    + ", ".join(
+                        f"{k}: {v}" for k, v in controler.get_counters().items()
+                    )
                 )
 
         return 0
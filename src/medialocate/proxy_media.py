@@ -25,13 +25,9 @@ def get_directories(names: list[str]) -> set[str]:
     Returns:
         set[str]: Set of resolved directory paths
     """
-    directories = set()
     if len(names) == 0:
-        directories.add(os.getcwd())
-    else:
-        for name in names:
-            directories.update(glob.glob(name))
-    return directories
+        return {os.getcwd()}
+    return {path for name in names for path in glob.iglob(name)}
 
 
 def main():
@@ -88,8 +84,9 @@ def main():
 
     try:
         with MediaProxiesControler(target_directory_name, logger_name) as proxies:
-            for directory in source_directories:
-                proxies.find_proxies(directory, proxy_threshold, args.f)
+            proxies.find_proxies_batch(
+                sorted(source_directories), proxy_threshold, args.f
+            )
     except Exception as e:
         log.error(f"{e}")
 
@@ -80,10 +80,12 @@ class DictStore:
         If the store file exists, loads its contents. Otherwise, creates an empty store.
         """
         if not self._is_open:
-            if os.path.exists(self._store_path):
-                with open(self._store_path, "r", encoding="utf-8") as f:
-                    self._store = json.load(f)
-            else:
+            # the file is decoded by json.loads in a single pass, and a missing
+            # file is only detected by open
+            try:
+                with open(self._store_path, "rb") as f:
+                    self._store = json.loads(f.read())
+            except FileNotFoundError:
                 self._store = {}
             self._is_open = True
             self._touched = False
@@ -98,8 +100,11 @@ class DictStore:
         if not self._is_open:
             raise DictStore.StoreNotOpenError("Cannot sync: store is not open")
         if self._is_open and self._touched:
-            with open(self._store_path, "w", encoding="utf-8") as f:
-                json.dump(self._store, f, indent=2)
+            # json.dumps without indent goes through the C encoder, json.dump does not
+            data = json.dumps(self._store)
+            # ensure_ascii makes the encoding trivial, the text layer is skipped
+            with open(self._store_path, "wb") as f:
+                f.write(data.encode("ascii"))
             self._touched = False
 
     def get(self, key: str, default: Any = None) -> Any:
@@ -130,6 +135,23 @@ class DictStore:
         self._store[key] = value
         self._touched = True
 
+    def update(self, items: Dict[str, Any]) -> None:
+        """Set several values in the store at once.
+
+        Args:
+            items: Mapping of keys to values to set
+        """
+        if not self._is_open:
+            raise DictStore.StoreNotOpenError("Cannot update items: store is not open")
+        changed = {
+            key: value
+            for key, value in items.items()
+            if key not in self._store or self._store[key] != value
+        }
+        if changed:
+            self._store.update(changed)
+            self._touched = True
+
     def pop(self, key: str) -> Optional[Any]:
         """Remove and return an item from the store.
 
@@ -11,6 +11,11 @@ import hashlib
 import urllib.parse
 from pathlib import Path
 
+# 16 bytes digests keep the 32 hexadecimal characters width of the former MD5 keys
+HASH_DIGEST_SIZE = 16
+# suffix of the file marking a store whose legacy MD5 keys have been migrated
+LEGACY_HASH_MIGRATED_SUFFIX = ".migrated"
+
 
 def relative_path_to_posix(path: str) -> str:
     """Convert a relative path to POSIX format.
@@ -69,15 +74,8 @@ def relative_path_to_uri(path: str) -> str:
     """
     normalized_path = relative_path_to_posix(path)
 
-    unreserved_characters = "/"
-
-    # encode each character except unreserved characters
-    encoded_path = "".join(
-        urllib.parse.quote(char) if char not in unreserved_characters else char
-        for char in normalized_path
-    )
-
-    return encoded_path
+    # encode every character except the path separators in a single pass
+    return urllib.parse.quote(normalized_path, safe="/")
 
 
 def to_uri(path: str) -> str:
@@ -107,9 +105,9 @@ def to_uri(path: str) -> str:
 
 
 def get_hash_from_relative_path(path: str) -> str:
-    """Generate a SHA-256 hash of a file path.
+    """Generate a BLAKE2b-128 hash of a file path.
 
-    This function generates a SHA-256 hash of a file path, which is useful for
+    This function generates a BLAKE2b hash of a file path, which is useful for
     generating unique identifiers for files and directories in a consistent manner, even
     across different operating systems.
     To ensure cross-platform compatibility, the relative path is required.
@@ -118,7 +116,25 @@ def get_hash_from_relative_path(path: str) -> str:
         path: File path to hash
 
     Returns:
-        str: Hexadecimal representation of the SHA-256 hash
+        str: Hexadecimal representation of the 16 bytes BLAKE2b hash
+    """
+    normalized_path = relative_path_to_posix(path)
+    return hashlib.blake2b(
+        normalized_path.encode("utf-8"), digest_size=HASH_DIGEST_SIZE
+    ).hexdigest()
+
+
+def get_legacy_hash_from_relative_path(path: str) -> str:
+    """Generate the MD5 hash formerly used to identify a file path.
+
+    Only meant to recognize keys written by earlier versions so that existing stores
+    can be migrated to get_hash_from_relative_path.
+
+    Args:
+        path: File path to hash
+
+    Returns:
+        str: Hexadecimal representation of the MD5 hash
     """
     normalized_path = relative_path_to_posix(path)
     return hashlib.md5(
@@ -126,10 +142,35 @@ def get_hash_from_relative_path(path: str) -> str:
     ).hexdigest()
 
 
+def is_legacy_hash_migrated(store_path: str) -> bool:
+    """Tell whether the legacy MD5 keys of a store have already been migrated.
+
+    Args:
+        store_path: Path to the store file
+
+    Returns:
+        bool: True if the store has been marked by mark_legacy_hash_migrated
+    """
+    return os.path.exists(store_path + LEGACY_HASH_MIGRATED_SUFFIX)
+
+
+def mark_legacy_hash_migrated(store_path: str) -> None:
+    """Record that the legacy MD5 keys of a store have been migrated.
+
+    The store must be synchronized first, so that a marked store never holds
+    legacy keys on disk.
+
+    Args:
+        store_path: Path to the store file
+    """
+    with open(store_path + LEGACY_HASH_MIGRATED_SUFFIX, "wb"):
+        pass
+
+
 def get_hash_from_native_path(path: str) -> str:
-    """Generate a SHA-256 hash of a file path.
+    """Generate a BLAKE2b-128 hash of a file path.
 
-    This function generates a SHA-256 hash of a file path, which is useful for
+    This function generates a BLAKE2b hash of a file path, which is useful for
     generating unique identifiers for files and directories in a consistent manner,
     in a given operating systems.
 
@@ -137,9 +178,11 @@ def get_hash_from_native_path(path: str) -> str:
         path: File path to hash
 
     Returns:
-        str: Hexadecimal representation of the SHA-256 hash
+        str: Hexadecimal representation of the 16 bytes BLAKE2b hash
     """
-    return hashlib.md5(path.encode("utf-8"), usedforsecurity=False).hexdigest()
+    return hashlib.blake2b(
+        path.encode("utf-8"), digest_size=HASH_DIGEST_SIZE
+    ).hexdigest()
 
 
 def get_extension(path: str) -> str:
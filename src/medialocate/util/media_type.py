@@ -93,11 +93,8 @@ class MediaTypeHelper:
         Returns:
             MediaType: The determined media type, or UNKNOWN if not recognized
         """
-        try:
-            media_info = MediaTypeHelper.media_types[get_extension(filename).lower()]
-            return media_info["media_type"]
-        except KeyError:
-            return MediaType.UNKNOWN
+        media_info = MediaTypeHelper.media_types.get(get_extension(filename).lower())
+        return media_info["media_type"] if media_info else MediaType.UNKNOWN
 
     @classmethod
     def get_iana_media_type(cls, filename: str) -> str:
@@ -127,6 +127,59 @@ class TestGroupMediaCommand(unittest.TestCase):
             "Groups file should not have been regenerated",
         )
 
+    def test_group_media_with_changed_threshold(self):
+        """Test grouping media again when the distance threshold changed"""
+        # Arrange
+        with open(self.location_store, "w") as f:
+            f.write(
+                '{"media1.jpg": {"gps":{"latitude": 48.8584, "longitude": 2.2945}}}'
+            )
+
+        # Wait to ensure different timestamps
+        time.sleep(0.1)
+
+        # Create existing groups data built with another threshold
+        with open(self.groups_store, "w") as f:
+            f.write('{"grouping_threshold": 5.0, "groups": []}')
+
+        # Act
+        with patch("os.getcwd") as mock_getcwd:
+            mock_getcwd.return_value = self.test_dir
+            with patch("sys.argv", ["group_mediax", "-d", "2.5"]):
+                main()
+
+        # Assert
+        with open(self.groups_store, "r") as f:
+            groups_data = json.load(f)
+            self.assertEqual(groups_data["grouping_threshold"], 2.5)
+            self.assertEqual(groups_data["groups"][0]["media_keys"], ["media1.jpg"])
+
+    def test_group_media_reads_threshold_header(self):
+        """Test the threshold is read from the header of the groups file only"""
+        # Arrange
+        with open(self.location_store, "w") as f:
+            f.write(
+                '{"media1.jpg": {"gps":{"latitude": 48.8584, "longitude": 2.2945}}}'
+            )
+
+        # Wait to ensure different timestamps
+        time.sleep(0.1)
+
+        # groups are not parsed, a truncated document still records the threshold
+        with open(self.groups_store, "w") as f:
+            f.write('{"grouping_threshold": 5.0, "groups": [')
+
+        # Act
+        with patch("os.getcwd") as mock_getcwd:
+            mock_getcwd.return_value = self.test_dir
+            with patch("sys.argv", ["group_mediax", "-d", "2.5"]):
+                main()
+
+        # Assert
+        with open(self.groups_store, "r") as f:
+            groups_data = json.load(f)
+            self.assertEqual(groups_data["grouping_threshold"], 2.5)
+
     def test_group_media_with_force_flag(self):
         """Test grouping media with force flag"""
         # Arrange
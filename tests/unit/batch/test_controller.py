@@ -1,6 +1,7 @@
 import os
 import time
 import tempfile
+import threading
 import unittest
 from enum import Enum
 from unittest.mock import patch
@@ -207,6 +208,47 @@ class TestProcessMemory(unittest.TestCase):
                 StatusMock.return_value.setState.assert_not_called()
                 StatusMock.return_value.update.assert_not_called()
 
+    @patch(f"{BATCH_CONTROLER}.os")
+    def test_process_for_done_status_with_stat_result(self, OsMock):
+        # Arrange
+        working_directory = "dummy_directory_name"
+        filename = "my_file.txt"
+        key = "key"
+        now = time.time()
+        stat_result = os.stat_result((0, 0, 0, 0, 0, 0, 0, 0, now + 1, 0))
+        states = Enum(
+            "State",
+            [
+                ("DONE", "done"),
+                ("ONGOING", "tmp"),
+                ("IGNORE", "ignore"),
+                ("ERROR", "error"),
+            ],
+        )
+
+        with patch(f"{BATCH_CONTROLER}.ProcessingStatus") as StatusMock:
+            StatusMock.filename_hash.return_value = key
+            StatusMock.getFromStore.return_value = StatusMock.return_value
+            StatusMock.return_value.getState.return_value = states.DONE
+            StatusMock.return_value.getTime.return_value = now
+            StatusMock.State.DONE = states.DONE
+            StatusMock.State.ONGOING = states.ONGOING
+            StatusMock.State.IGNORE = states.IGNORE
+            StatusMock.State.ERROR = states.ERROR
+            with patch(f"{BATCH_CONTROLER}.DictStore"):
+                orchestrator = ActionControler(
+                    working_directory,
+                    action=lambda file_to_process, filename_hash: 0,
+                )
+
+                # Act
+                orchestrator.process(filename, stat_result)
+
+                # Assert
+                OsMock.path.getmtime.assert_not_called()
+                StatusMock.return_value.setState.assert_called_once_with(states.DONE)
+                StatusMock.return_value.update.assert_called_once()
+
     def test_process_forced_for_done_status(self):
         # Arrange
         working_directory = "dummy_directory_name"
@@ -386,6 +428,85 @@ class TestProcessMemory(unittest.TestCase):
     ProcessingOrchestrator.clean unit tests
     """
 
+    def test_process_with_preparing_action(self):
+        # Arrange
+        working_directory = "dummy_directory_name"
+        filenames = ["my_file_1.txt", "my_file_2.txt"]
+        calls = []
+
+        class PreparingAction:
+            def __call__(self, file, file_hash):
+                calls.append(("call", file))
+                return 0
+
+            def prepare(self, files):
+                calls.append(("prepare", files))
+
+        with patch(f"{BATCH_CONTROLER}.ProcessingStatus") as StatusMock:
+            StatusMock.filename_hash.side_effect = lambda filename: filename
+            StatusMock.getFromStore.return_value = None
+            with patch(f"{BATCH_CONTROLER}.DictStore"):
+                orchestrator = ActionControler(
+                    working_directory,
+                    action=PreparingAction(),
+                )
+
+                # Act
+                for filename in filenames:
+                    orchestrator.process(filename)
+                queued_calls = list(calls)
+                orchestrator.flush()
+
+                # Assert
+                self.assertEqual(queued_calls, [])
+                self.assertEqual(
+                    calls,
+                    [
+                        ("prepare", filenames),
+                        ("call", filenames[0]),
+                        ("call", filenames[1]),
+                    ],
+                )
+                self.assertEqual(
+                    orchestrator.get_counters()[ActionControler.SUCCEEDED], 2
+                )
+
+    def test_process_with_preparing_action_and_workers(self):
+        # Arrange
+        working_directory = "dummy_directory_name"
+        filenames = [f"my_file_{i}.txt" for i in range(8)]
+        threads = set()
+
+        class PreparingAction:
+            def __call__(self, file, file_hash):
+                threads.add(threading.get_ident())
+                return 0
+
+            def prepare(self, files):
+                pass
+
+        with patch(f"{BATCH_CONTROLER}.ProcessingStatus") as StatusMock:
+            StatusMock.filename_hash.side_effect = lambda filename: filename
+            StatusMock.getFromStore.return_value = None
+            with patch(f"{BATCH_CONTROLER}.DictStore"):
+                orchestrator = ActionControler(
+                    working_directory,
+                    action=PreparingAction(),
+                    max_workers=4,
+                )
+
+                # Act
+                for filename in filenames:
+                    orchestrator.process(filename)
+                orchestrator.flush()
+
+                # Assert
+                self.assertNotIn(threading.get_ident(), threads)
+                self.assertEqual(
+                    orchestrator.get_counters()[ActionControler.SUCCEEDED], 8
+                )
+                self.assertEqual(StatusMock.return_value.update.call_count, 8)
+
     @patch(f"{BATCH_CONTROLER}.os")
     def test_clean(self, OsMock):
         filename = "my_file.txt"
@@ -394,10 +515,9 @@ class TestProcessMemory(unittest.TestCase):
         OsMock.path.isfile.return_value = False
 
         with patch(f"{BATCH_CONTROLER}.ProcessingStatus") as StatusMock:
-            StatusMock.getAllFromStore.return_value = [
-                StatusMock.return_value for _ in range(10)
+            StatusMock.getAllRawFromStore.return_value = [
+                (f"key{i}", StatusMock.State.DONE, filename, 0.0) for i in range(10)
             ]
-            StatusMock.return_value.getFilename.return_value = filename
             with patch(f"{BATCH_CONTROLER}.DictStore") as StoreMock:
                 StoreMock.return_value.get.return_value = None
                 orchestrator = ActionControler(
@@ -408,11 +528,14 @@ class TestProcessMemory(unittest.TestCase):
                 orchestrator.clean()
 
                 # Assert
-                StatusMock.getAllFromStore.assert_called_once_with(
+                StatusMock.getAllRawFromStore.assert_called_once_with(
                     StoreMock.return_value
                 )
-                StatusMock.return_value.getFilename.assert_called()
-                StatusMock.return_value.delete.assert_called()
+                self.assertEqual(StoreMock.return_value.pop.call_count, 10)
+                StoreMock.return_value.pop.assert_called_with("key9")
+                self.assertEqual(
+                    orchestrator.get_counters()[ActionControler.DELETED], 10
+                )
 
     """
     ProcessingOrchestrator.drop unit tests
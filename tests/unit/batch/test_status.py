@@ -1,5 +1,8 @@
+import os
 import time
+import shutil
 import hashlib
+import tempfile
 import unittest
 from unittest.mock import patch
 from medialocate.batch.status import ProcessingStatus
@@ -53,11 +56,37 @@ class TestProcessingStatus(unittest.TestCase):
         self.assertEqual(status._isNew, True)
         self.assertEqual(status._isUpdated, False)
 
+    @patch(f"{STORE_DICT}.DictStore")
+    def test_init_Status_instance_has_no_dict(self, StoreMock):
+        """ "Test Status instances only hold their declared attributes"""
+        # Act
+        status = ProcessingStatus(StoreMock.return_value, "key", "status", "filename")
+
+        # Assert
+        self.assertFalse(hasattr(status, "__dict__"))
+        with self.assertRaises(AttributeError):
+            status.stat = ProcessingStatus.State.DONE
+
+    @patch(f"{STORE_DICT}.DictStore")
+    def test_init_Status_instance_default_time_is_evaluated_per_call(self, StoreMock):
+        """ "Test default time is taken when each instance is created"""
+        # Arrange
+        storeMock = StoreMock.return_value
+
+        # Act
+        with patch("time.time", side_effect=[1.0, 2.0]):
+            status1 = ProcessingStatus(storeMock, "key1", "status", "filename1")
+            status2 = ProcessingStatus(storeMock, "key2", "status", "filename2")
+
+        # Assert
+        self.assertEqual(status1.time, 1.0)
+        self.assertEqual(status2.time, 2.0)
+
     def test_filename_hash_with_ascii_string(self):
         """ "Test filename hash with ascii string"""
         # Arrange
         filename = "hello"
-        hash = hashlib.md5(filename.encode("utf-8")).hexdigest()
+        hash = hashlib.blake2b(filename.encode("utf-8"), digest_size=16).hexdigest()
 
         # Act & Assert
         self.assertEqual(ProcessingStatus.filename_hash(filename), hash)
@@ -66,7 +95,7 @@ class TestProcessingStatus(unittest.TestCase):
         """ "Test filename hash with non ascii string"""
         # Arrange
         filename = "hëllo"
-        hash = hashlib.md5(filename.encode("utf-8")).hexdigest()
+        hash = hashlib.blake2b(filename.encode("utf-8"), digest_size=16).hexdigest()
 
         # Act & Assert
         self.assertEqual(ProcessingStatus.filename_hash(filename), hash)
@@ -75,7 +104,7 @@ class TestProcessingStatus(unittest.TestCase):
         """ "Test filename hash with special characters"""
         # Arrange
         filename = "hëllo!@#$"
-        hash = hashlib.md5(filename.encode("utf-8")).hexdigest()
+        hash = hashlib.blake2b(filename.encode("utf-8"), digest_size=16).hexdigest()
 
         # Act & Assert
         self.assertEqual(ProcessingStatus.filename_hash(filename), hash)
@@ -84,11 +113,48 @@ class TestProcessingStatus(unittest.TestCase):
         """ "Test filename hash with long string"""
         # Arrange
         filename = "a" * 1000
-        hash = hashlib.md5(filename.encode("utf-8")).hexdigest()
+        hash = hashlib.blake2b(filename.encode("utf-8"), digest_size=16).hexdigest()
 
         # Act & Assert
         self.assertEqual(ProcessingStatus.filename_hash(filename), hash)
 
+    def test_filename_hash_is_memoized(self):
+        """ "Test filename hash is computed once per filename"""
+        # Arrange
+        filename = "memoized/hello.jpg"
+        expected = ProcessingStatus.filename_hash(filename)
+
+        # Act
+        with patch(
+            "medialocate.util.file_naming.hashlib.blake2b",
+            side_effect=AssertionError("hash recomputed"),
+        ):
+            hash = ProcessingStatus.filename_hash(filename)
+
+        # Assert
+        self.assertEqual(hash, expected)
+
+    @patch(f"{STORE_DICT}.DictStore")
+    def test_init_filename_conversion_is_memoized(self, StoreMock):
+        """ "Test filename is converted to POSIX format once per filename"""
+        # Arrange
+        filename = "memoized/posix.jpg"
+        expected = ProcessingStatus(
+            StoreMock.return_value, "key", ProcessingStatus.State.DONE, filename
+        ).getFilename()
+
+        # Act
+        with patch(
+            "medialocate.util.file_naming.Path",
+            side_effect=AssertionError("filename converted again"),
+        ):
+            status = ProcessingStatus(
+                StoreMock.return_value, "key", ProcessingStatus.State.DONE, filename
+            )
+
+        # Assert
+        self.assertEqual(status.getFilename(), expected)
+
     def test_filename_hash_with_posix_and_windows_pathnames(self):
         """ "Test with posix and windows pathnames"""
         # Arrange
@@ -188,6 +254,43 @@ class TestProcessingStatus(unittest.TestCase):
         self.assertEqual(statuses[2].time, now)
         self.assertEqual(statuses[2].filename, filename3)
 
+    @patch(f"{STORE_DICT}.DictStore")
+    def test_getAllRawFromStore(self, StoreMock):
+        """Test getAllRawFromStore"""
+        # Arrange
+        now = time.time()
+        storeMock = StoreMock.return_value
+        storeMock.items.return_value = [
+            (
+                "key1",
+                {
+                    ProcessingStatus._state_key: ProcessingStatus.State.DONE.value,
+                    ProcessingStatus._filename_key: "filename1",
+                    ProcessingStatus._time_key: now,
+                },
+            ),
+            (
+                "key2",
+                {
+                    ProcessingStatus._state_key: ProcessingStatus.State.ERROR.value,
+                    ProcessingStatus._filename_key: "filename2",
+                    ProcessingStatus._time_key: now,
+                },
+            ),
+        ]
+
+        # Act
+        statuses = list(ProcessingStatus.getAllRawFromStore(storeMock))
+
+        # Assert
+        self.assertEqual(
+            statuses,
+            [
+                ("key1", ProcessingStatus.State.DONE, "filename1", now),
+                ("key2", ProcessingStatus.State.ERROR, "filename2", now),
+            ],
+        )
+
     @patch(f"{STORE_DICT}.DictStore")
     def test_deleteAll(self, StoreMock):
         """ "Test deleteAll"""
@@ -201,6 +304,69 @@ class TestProcessingStatus(unittest.TestCase):
         # Assert
         storeMock.clear.assert_called_once()
 
+    @patch(f"{STORE_DICT}.DictStore")
+    def test_migrateStore(self, StoreMock):
+        """ "Test migrateStore re-keys legacy statuses only"""
+        # Arrange
+        legacy_filename = "legacy.jpg"
+        current_filename = "current.jpg"
+        legacy_key = hashlib.md5(
+            legacy_filename.encode("utf-8"), usedforsecurity=False
+        ).hexdigest()
+        current_key = ProcessingStatus.filename_hash(current_filename)
+        legacy_value = {
+            ProcessingStatus._state_key: ProcessingStatus.State.DONE.value,
+            ProcessingStatus._filename_key: legacy_filename,
+            ProcessingStatus._time_key: 1.0,
+        }
+        current_value = {
+            ProcessingStatus._state_key: ProcessingStatus.State.DONE.value,
+            ProcessingStatus._filename_key: current_filename,
+            ProcessingStatus._time_key: 1.0,
+        }
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        storeMock = StoreMock.return_value
+        storeMock.get_path.return_value = os.path.join(temp_dir, "store.json")
+        storeMock.__len__.return_value = 2
+        storeMock.items.return_value = [
+            (legacy_key, legacy_value),
+            (current_key, current_value),
+        ]
+
+        # Act
+        migrated = ProcessingStatus.migrateStore(storeMock)
+        migrated_again = ProcessingStatus.migrateStore(storeMock)
+
+        # Assert
+        self.assertEqual(migrated, 1)
+        self.assertEqual(migrated_again, 0)
+        storeMock.items.assert_called_once()
+        storeMock.sync.assert_called_once()
+        storeMock.pop.assert_called_once_with(legacy_key)
+        storeMock.set.assert_called_once_with(
+            ProcessingStatus.filename_hash(legacy_filename), legacy_value
+        )
+
+    @patch(f"{STORE_DICT}.DictStore")
+    def test_migrateStore_empty_store_not_marked(self, StoreMock):
+        """ "Test migrateStore leaves new or empty stores unmarked"""
+        # Arrange
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        store_path = os.path.join(temp_dir, "store.json")
+        storeMock = StoreMock.return_value
+        storeMock.get_path.return_value = store_path
+        storeMock.__len__.return_value = 0
+
+        # Act
+        migrated = ProcessingStatus.migrateStore(storeMock)
+
+        # Assert
+        self.assertEqual(migrated, 0)
+        storeMock.items.assert_not_called()
+        self.assertEqual(os.listdir(temp_dir), [])
+
     @patch(f"{STORE_DICT}.DictStore")
     def test_getFilename(self, StoreMock):
         """ "Test getFilename"""
@@ -282,6 +448,50 @@ class TestProcessingStatus(unittest.TestCase):
             storeMock.set.call_args[0][1][ProcessingStatus._time_key], now + 1
         )
 
+    @patch(f"{STORE_DICT}.DictStore")
+    def test_update_new_with_pending(self, StoreMock):
+        """Test update on new store collected in a pending buffer"""
+        # Arrange
+        storeMock = StoreMock.return_value
+        state = ProcessingStatus.State.DONE
+        status = ProcessingStatus(storeMock, "updated_key", state, "updated_filename")
+        pending = {}
+
+        # Act
+        status.update(pending)
+
+        # Assert
+        storeMock.set.assert_not_called()
+        self.assertEqual(
+            pending,
+            {
+                "updated_key": {
+                    ProcessingStatus._state_key: state.value,
+                    ProcessingStatus._filename_key: "updated_filename",
+                    ProcessingStatus._time_key: status.time,
+                }
+            },
+        )
+
+    @patch(f"{STORE_DICT}.DictStore")
+    def test_update_new_with_given_time(self, StoreMock):
+        """Test update on new store with a time shared by a batch of updates"""
+        # Arrange
+        state = ProcessingStatus.State.DONE
+        status = ProcessingStatus(
+            StoreMock.return_value, "updated_key", state, "updated_filename", 1.0
+        )
+        pending = {}
+
+        # Act
+        with patch("time.time") as time_mock:
+            status.update(pending, now=2.0)
+
+        # Assert
+        time_mock.assert_not_called()
+        self.assertEqual(status.time, 2.0)
+        self.assertEqual(pending["updated_key"][ProcessingStatus._time_key], 2.0)
+
     @patch(f"{STORE_DICT}.DictStore")
     def test_update_get_from_store_modified(self, StoreMock):
         """Test update on modified store"""
@@ -285,6 +285,21 @@ class TestFileFinder(unittest.TestCase):
         # Assert
         self.assertEqual(len(files), self.expected_files_count["extension filter"])
 
+    def test_find_with_extension_filter_without_dot(self):
+        # Arrange
+        root_path = os.path.join(self.working_directory, self.root_dirname)
+        extensions = [
+            extension.upper().lstrip(".")
+            for extension in self.filters["extension filter"]
+        ]
+        finder = FileFinder(root_path, extensions=extensions)
+
+        # Act
+        files = list(finder.find())
+
+        # Assert
+        self.assertEqual(len(files), self.expected_files_count["extension filter"])
+
     def test_find_with_directory_filter(self):
         # Arrange
         root_path = os.path.join(self.working_directory, self.root_dirname)
@@ -318,6 +333,74 @@ class TestFileFinder(unittest.TestCase):
         # Assert
         self.assertEqual(len(files), self.expected_files_count["age filter"])
 
+    def test_find_with_age_filter_and_stat_workers(self):
+        # Arrange
+        root_path = os.path.join(self.working_directory, self.root_dirname)
+        finder = FileFinder(
+            root_path, min_age=self.filters["age filter"], stat_workers=4
+        )
+
+        # Act
+        files = list(finder.find())
+
+        # Assert
+        self.assertEqual(
+            sorted(files),
+            sorted(FileFinder(root_path, min_age=self.filters["age filter"]).find()),
+        )
+        self.assertEqual(len(files), self.expected_files_count["age filter"])
+
+    def test_find_with_stat(self):
+        # Arrange
+        root_path = os.path.join(self.working_directory, self.root_dirname)
+        age_limit = self.filters["age filter"]
+
+        # Act
+        with_age = list(FileFinder(root_path, min_age=age_limit).find_with_stat())
+        without_age = list(FileFinder(root_path).find_with_stat())
+
+        # Assert
+        self.assertEqual(len(with_age), self.expected_files_count["age filter"])
+        for file, stat_result in with_age:
+            self.assertEqual(stat_result.st_mtime, os.path.getmtime(file))
+            self.assertGreater(stat_result.st_mtime, age_limit)
+        self.assertEqual(len(without_age), self.expected_files_count["no filter"])
+        self.assertTrue(all(stat_result is None for _, stat_result in without_age))
+
+    def test_find_with_age_filter_and_new_files_only(self):
+        # Arrange
+        root_path = os.path.join(self.working_directory, self.root_dirname)
+        finder = FileFinder(
+            root_path, min_age=self.filters["age filter"], new_files_only=True
+        )
+
+        # Act
+        files = list(finder.find())
+
+        # Assert
+        self.assertEqual(len(files), self.expected_files_count["age filter"])
+        self.assertEqual(
+            finder.get_counters()["files"], self.expected_files_count["no filter"]
+        )
+
+    def test_find_with_relative_paths(self):
+        # Arrange
+        root_path = os.path.join(self.working_directory, self.root_dirname)
+        finder = FileFinder(root_path, relative_paths=True)
+
+        # Act
+        files = list(finder.find())
+
+        # Assert
+        self.assertEqual(len(files), self.expected_files_count["no filter"])
+        self.assertEqual(
+            sorted(os.path.join(root_path, file) for file in files),
+            sorted(FileFinder(root_path).find()),
+        )
+        for file in files:
+            self.assertFalse(os.path.isabs(file))
+            self.assertTrue(os.path.isfile(os.path.join(root_path, file)))
+
     def test_find_with_all_filters(self):
         # Arrange
         root_path = os.path.join(self.working_directory, self.root_dirname)
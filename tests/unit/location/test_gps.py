@@ -1,5 +1,5 @@
 import unittest
-from medialocate.location.gps import GPS
+from medialocate.location.gps import GPS, LatitudeIndex
 
 
 class TestGPS(unittest.TestCase):
@@ -31,6 +31,20 @@ class TestGPS(unittest.TestCase):
         with self.assertRaises(ValueError):
             GPS(0, -181)  # Invalid longitude (<-180)
 
+    def test_pair_conversion(self):
+        # Test compact serialization round trip
+        gps = GPS(45.5, -122.6)
+        self.assertEqual(gps.toPair(), [45.5, -122.6])
+        restored = GPS.fromPair(gps.toPair())
+        self.assertEqual(restored.latitude, 45.5)
+        self.assertEqual(restored.longitude, -122.6)
+
+    def test_from_pair_with_dict(self):
+        # Test compact deserialization accepts the dictionary format
+        gps = GPS.fromPair({"latitude": 45.5, "longitude": -122.6})
+        self.assertEqual(gps.latitude, 45.5)
+        self.assertEqual(gps.longitude, -122.6)
+
     def test_distance_calculation(self):
         # Test distance calculation between two points
         point1 = GPS(45.5, -122.6)  # Portland, OR approximate
@@ -55,6 +69,90 @@ class TestGPS(unittest.TestCase):
             distance, 20015.1, delta=0.2
         )  # Half Earth's circumference in km
 
+    def test_radian_point_is_cached(self):
+        # Test trigonometric inputs are computed once per coordinate
+        gps = GPS(45.5, -122.6)
+        radian_point = gps.radian_point
+        self.assertAlmostEqual(radian_point[0], 0.7941248, places=6)
+        self.assertAlmostEqual(radian_point[1], -2.1397737, places=6)
+        self.assertAlmostEqual(radian_point[2], 0.7009093, places=6)
+        self.assertIs(gps.radian_point, radian_point)
+
+    def test_indexes_within(self):
+        # Test proximity search keeps only points closer than the distance
+        point = GPS(48.8584, 2.2945)
+        targets = [
+            GPS(48.8591, 2.2950),  # about 90 m away
+            GPS(47.6062, -122.3321),  # far away
+            GPS(48.8584, 2.3100),  # same latitude, about 1.1 km away
+        ]
+        points = GPS.to_radian_points(targets)
+        self.assertEqual(point.indexes_within(points, 1.0), [0])
+        self.assertEqual(point.indexes_within(points, 2.0), [0, 2])
+
+    def test_indexes_within_longitude_range(self):
+        # Test proximity search across the antimeridian and close to a pole, where
+        # the longitude range is not bounded
+        point = GPS(10.0, 179.995)
+        targets = [GPS(10.0, -179.995), GPS(10.0, 170.0), GPS(10.0, -170.0)]
+        points = GPS.to_radian_points(targets)
+        self.assertEqual(point.indexes_within(points, 2.0), [0])
+        polar_point = GPS(89.999, 0.0)
+        polar_points = GPS.to_radian_points([GPS(89.999, 180.0), GPS(89.0, 180.0)])
+        self.assertEqual(polar_point.indexes_within(polar_points, 1.0), [0])
+
+    def test_indexes_within_beyond_half_circumference(self):
+        # Test proximity search keeps every point when the distance exceeds the
+        # largest possible distance on Earth
+        point = GPS(0, 0)
+        points = GPS.to_radian_points([GPS(0, 180), GPS(45.5, -122.6)])
+        self.assertEqual(point.indexes_within(points, 25000), [0, 1])
+
+    def test_latitude_index_indexes_within(self):
+        # Test indexed proximity search returns indexes in the indexed list order
+        targets = [
+            GPS(48.8584, 2.3100),  # same latitude, about 1.1 km away
+            GPS(47.6062, -122.3321),  # far away
+            GPS(48.8591, 2.2950),  # about 90 m away
+            GPS(48.8500, 2.2945),  # about 930 m south
+        ]
+        index = LatitudeIndex(targets)
+        point = GPS(48.8584, 2.2945)
+        self.assertEqual(index.indexes_within(point, 1.0), [2, 3])
+        self.assertEqual(index.indexes_within(point, 2.0), [0, 2, 3])
+        self.assertEqual(LatitudeIndex([]).indexes_within(point, 2.0), [])
+
+    def test_midpoint_to(self):
+        # Test midpoint lies on the great circle halfway between the points
+        point1 = GPS(45.5, -122.6)
+        point2 = GPS(47.6, -122.3)
+        midpoint = point1.midpoint_to(point2)
+        self.assertAlmostEqual(
+            midpoint.distance_to(point1), midpoint.distance_to(point2), places=6
+        )
+        self.assertAlmostEqual(
+            midpoint.distance_to(point1), point1.distance_to(point2) / 2, places=6
+        )
+        equator_midpoint = GPS(0, 10).midpoint_to(GPS(0, 30))
+        self.assertAlmostEqual(equator_midpoint.latitude, 0)
+        self.assertAlmostEqual(equator_midpoint.longitude, 20)
+
+    def test_barycenter_to_moves_toward_target(self):
+        # Test weighted barycenter lies between the points, closer to the heavier
+        point = GPS(10.0, 20.0)
+        barycenter = point.barycenter_to(GPS(14.0, 24.0), 3)
+        self.assertAlmostEqual(barycenter.latitude, 11.0)
+        self.assertAlmostEqual(barycenter.longitude, 21.0)
+
+    def test_cartesian_conversion(self):
+        # Test unit vector round trip, only the vector direction matters
+        gps = GPS(45.5, -122.6)
+        x, y, z = gps.to_cartesian()
+        self.assertAlmostEqual(x * x + y * y + z * z, 1.0)
+        restored = GPS.from_cartesian(3 * x, 3 * y, 3 * z)
+        self.assertAlmostEqual(restored.latitude, 45.5)
+        self.assertAlmostEqual(restored.longitude, -122.6)
+
     def test_str_representation(self):
         # Test string representation
         gps = GPS(45.5, -122.6)
@@ -0,0 +1,101 @@
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+from medialocate.media.gps_reader import read_gps
+
+
+def make_jpeg(latitude_ref=b"N", longitude_ref=b"W", order="<"):
+    """Build a JPEG header with Exif GPS data of 45°30'0" and 122°36'0"."""
+    byte_order = b"II" if order == "<" else b"MM"
+    ifd0_offset = 8
+    gps_offset = ifd0_offset + 2 + 12 + 4
+    rationals_offset = gps_offset + 2 + 4 * 12 + 4
+
+    tiff = byte_order + struct.pack(f"{order}HI", 42, ifd0_offset)
+    tiff += struct.pack(f"{order}HHHII", 1, 0x8825, 4, 1, gps_offset) + b"\0" * 4
+    tiff += struct.pack(f"{order}H", 4)
+    tiff += struct.pack(f"{order}HHI", 1, 2, 2) + latitude_ref + b"\0\0\0"
+    tiff += struct.pack(f"{order}HHII", 2, 5, 3, rationals_offset)
+    tiff += struct.pack(f"{order}HHI", 3, 2, 2) + longitude_ref + b"\0\0\0"
+    tiff += struct.pack(f"{order}HHII", 4, 5, 3, rationals_offset + 24)
+    tiff += b"\0" * 4
+    tiff += struct.pack(f"{order}6I", 45, 1, 30, 1, 0, 1)
+    tiff += struct.pack(f"{order}6I", 122, 1, 36, 1, 0, 1)
+
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\0" + b"\0" * 9
+    exif = b"Exif\0\0" + tiff
+    app1 = b"\xff\xe1" + struct.pack(">H", len(exif) + 2) + exif
+    return b"\xff\xd8" + app0 + app1 + b"\xff\xda\0\x02"
+
+
+def make_box(box_type, content):
+    return struct.pack(">I", len(content) + 8) + box_type + content
+
+
+def make_mp4(location=b"+48.8584+002.2945/"):
+    """Build an MP4 header with user data GPS coordinates."""
+    xyz = make_box(b"\xa9xyz", struct.pack(">HH", len(location), 0x15C7) + location)
+    moov = make_box(b"moov", make_box(b"mvhd", b"\0" * 100) + make_box(b"udta", xyz))
+    return make_box(b"ftyp", b"isom\0\0\0\0") + make_box(b"mdat", b"\0" * 64) + moov
+
+
+class TestGPSReader(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, filename, content):
+        path = os.path.join(self.temp_dir, filename)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def test_read_jpeg_gps(self):
+        for order in ("<", ">"):
+            with self.subTest(order=order):
+                path = self.write("picture.jpg", make_jpeg(order=order))
+                latitude, longitude = read_gps(path, "jpg")
+                self.assertAlmostEqual(latitude, 45.5)
+                self.assertAlmostEqual(longitude, -122.6)
+
+    def test_read_jpeg_gps_references(self):
+        path = self.write("picture.jpg", make_jpeg(b"S", b"E"))
+        latitude, longitude = read_gps(path, "jpeg")
+        self.assertAlmostEqual(latitude, -45.5)
+        self.assertAlmostEqual(longitude, 122.6)
+
+    def test_read_mp4_gps(self):
+        path = self.write("movie.mp4", make_mp4())
+        self.assertEqual(read_gps(path, "mp4"), (48.8584, 2.2945))
+
+    def test_read_mp4_gps_without_location(self):
+        path = self.write("movie.mp4", make_mp4(b""))
+        self.assertIsNone(read_gps(path, "mp4"))
+
+    def test_read_gps_not_found(self):
+        # Test files without GPS data where expected are left to exiftool
+        test_cases = {
+            "empty.jpg": b"",
+            "truncated.jpg": make_jpeg()[:40],
+            "no_exif.jpg": b"\xff\xd8\xff\xda\0\x02",
+            "empty.mp4": b"",
+            "no_moov.mp4": make_box(b"ftyp", b"isom\0\0\0\0"),
+            "picture.png": make_jpeg(),
+        }
+        for filename, content in test_cases.items():
+            with self.subTest(filename=filename):
+                path = self.write(filename, content)
+                extension = os.path.splitext(filename)[1][1:]
+                self.assertIsNone(read_gps(path, extension))
+
+    def test_read_gps_missing_file(self):
+        path = os.path.join(self.temp_dir, "missing.jpg")
+        self.assertIsNone(read_gps(path, "jpg"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,6 +11,7 @@ from medialocate.media.group_proxy import (
     MEDIALOCATION_DIR,
     MEDIAGROUPS_STORE_NAME,
     MEDIAPROXIES_STORE_PATH,
+    _load_media_groups,
 )
 from medialocate.location.gps import GPS
 from medialocate.media.location_grouping import MediaGroups
@@ -29,6 +30,12 @@ class TestMediaProxiesProxy(unittest.TestCase):
         self.assertEqual(proxy.proxy_threshold, self.proxy_threshold)
         self.assertEqual(proxy.proxy_matches, [])
 
+    def test_proxy_creation_default_matches_not_shared(self):
+        # Test default matches are not shared between instances
+        proxy = Proxy(self.proxy_threshold)
+        proxy.proxy_matches.append((self.gps1, [self.gps2]))
+        self.assertEqual(Proxy(self.proxy_threshold).proxy_matches, [])
+
     def test_proxy_creation_with_matches(self):
         # Test creation with matches
         my_matches = [(self.gps1, [self.gps2, self.gps3])]
@@ -54,6 +61,35 @@ class TestMediaProxiesProxy(unittest.TestCase):
         self.assertEqual(len(restored.proxy_matches), len(original.proxy_matches))
         self.assertEqual(restored.last_update, original.last_update)
 
+    def test_proxy_to_dict_reuses_loaded_matches(self):
+        # Test unchanged loaded matches are not serialized again
+        proxy_dict = Proxy(self.proxy_threshold, [(self.gps1, [self.gps2])]).toDict()
+        restored = Proxy.fromDict(proxy_dict)
+        self.assertIs(restored.toDict()["proxy_matches"], proxy_dict["proxy_matches"])
+
+    def test_proxy_from_dict_builds_matches_on_use(self):
+        # Test loaded matches give back the GPS coordinates they were built from
+        proxy_dict = Proxy(
+            self.proxy_threshold, [(self.gps1, [self.gps2, self.gps3])]
+        ).toDict()
+        restored = Proxy.fromDict(proxy_dict)
+        gps, gps_list = restored.proxy_matches[0]
+        self.assertEqual(gps.toPair(), self.gps1.toPair())
+        self.assertEqual(
+            [g.toPair() for g in gps_list], [self.gps2.toPair(), self.gps3.toPair()]
+        )
+        self.assertIs(restored.proxy_matches, restored.proxy_matches)
+
+    def test_proxy_to_dict_after_matches_modified(self):
+        # Test matches modified in place or replaced are serialized again
+        proxy = Proxy.fromDict(
+            Proxy(self.proxy_threshold, [(self.gps1, [self.gps2])]).toDict()
+        )
+        proxy.proxy_matches.append((self.gps2, [self.gps3]))
+        self.assertEqual(len(proxy.toDict()["proxy_matches"]), 2)
+        proxy.proxy_matches = []
+        self.assertEqual(proxy.toDict()["proxy_matches"], [])
+
 
 class TestMediaProxies(unittest.TestCase):
     def setUp(self):
@@ -74,6 +110,16 @@ class TestMediaProxies(unittest.TestCase):
         self.assertIsInstance(proxies.proxies, dict)
         self.assertEqual(len(proxies.proxies), 0)
 
+    def test_proxies_initialization_defaults_not_shared(self):
+        # Test default collections are not shared between instances
+        proxies = MediaProxies("test_group")
+        proxies.group_locations.append(self.gps1)
+        proxies.proxies["other_group"] = Proxy(self.proxy_threshold)
+
+        fresh = MediaProxies("test_group")
+        self.assertEqual(fresh.group_locations, [])
+        self.assertEqual(fresh.proxies, {})
+
     def test_proxies_matching(self):
         # Find proxies
         found = self.proxies.find_proxies(
@@ -160,6 +206,73 @@ class TestMediaProxiesController(unittest.TestCase):
         finally:
             shutil.rmtree(source_dir)
 
+    def test_proxy_finding_batch(self):
+        # Arrange
+        controller_groups = MediaGroups(grouping_threshold=self.proxy_threshold)
+        controller_groups.groups = [MediaGroups.Group(self.gps1, ["file1.jpg"])]
+        medialocation_dir = os.path.join(self.temp_dir, MEDIALOCATION_DIR)
+        os.makedirs(medialocation_dir, exist_ok=True)
+        with open(os.path.join(medialocation_dir, MEDIAGROUPS_STORE_NAME), "w") as f:
+            json.dump(controller_groups.toDict(), f)
+
+        source_dirs = []
+        for gps in (self.gps2, GPS(47.6, -122.3), self.gps2):
+            source_groups = MediaGroups(grouping_threshold=self.proxy_threshold)
+            source_groups.groups = [MediaGroups.Group(gps, ["file2.jpg"])]
+            source_dir = tempfile.mkdtemp()
+            self.addCleanup(shutil.rmtree, source_dir)
+            os.makedirs(os.path.join(source_dir, MEDIALOCATION_DIR))
+            source_groups_path = os.path.join(
+                source_dir, MEDIALOCATION_DIR, MEDIAGROUPS_STORE_NAME
+            )
+            with open(source_groups_path, "w") as f:
+                json.dump(source_groups.toDict(), f)
+            source_dirs.append(source_dir)
+        missing_dir = os.path.join(self.temp_dir, "missing")
+
+        # Act
+        with self.controller as controller:
+            proxy_count = controller.find_proxies_batch(
+                source_dirs + [missing_dir], self.proxy_threshold, max_workers=2
+            )
+            proxies = controller.proxies.proxies
+            updated = controller.updated
+
+        # Assert
+        self.assertEqual(proxy_count, 2)
+        self.assertTrue(updated)
+        self.assertEqual(
+            sorted(proxies), sorted(os.path.basename(d) for d in source_dirs)
+        )
+        found = {
+            name: sum(len(gps_list) for _, gps_list in proxy.proxy_matches)
+            for name, proxy in proxies.items()
+        }
+        self.assertEqual(sorted(found.values()), [0, 1, 1])
+
+    def test_groups_store_loaded_once_until_modified(self):
+        # Arrange
+        groups = MediaGroups(grouping_threshold=self.proxy_threshold)
+        groups.groups = [MediaGroups.Group(self.gps1, ["file1.jpg"])]
+        groups_path = os.path.join(self.temp_dir, MEDIAGROUPS_STORE_NAME)
+        with open(groups_path, "w") as f:
+            json.dump(groups.toDict(), f)
+        stat = os.stat(groups_path)
+
+        # Act
+        first = _load_media_groups(groups_path, stat.st_mtime_ns, stat.st_size)
+        second = _load_media_groups(groups_path, stat.st_mtime_ns, stat.st_size)
+        groups.groups.append(MediaGroups.Group(self.gps2, ["file2.jpg"]))
+        with open(groups_path, "w") as f:
+            json.dump(groups.toDict(), f)
+        stat = os.stat(groups_path)
+        third = _load_media_groups(groups_path, stat.st_mtime_ns, stat.st_size)
+
+        # Assert
+        self.assertIs(first, second)
+        self.assertEqual(len(first.groups), 1)
+        self.assertEqual(len(third.groups), 2)
+
     def test_store_operations(self):
         # Create controller's MediaGroups
         controller_groups = MediaGroups(grouping_threshold=self.proxy_threshold)
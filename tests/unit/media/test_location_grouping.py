@@ -1,6 +1,9 @@
+import io
+import json
+import math
 import unittest
 from medialocate.media.location_grouping import MediaGroups
-from medialocate.location.gps import GPS
+from medialocate.location.gps import EARTH_RADIUS, GPS
 
 
 class TestMediaGroupsGroup(unittest.TestCase):
@@ -17,7 +20,7 @@ class TestMediaGroupsGroup(unittest.TestCase):
         group = MediaGroups.Group(self.gps, self.media_keys)
         group_dict = group.toDict()
 
-        self.assertEqual(group_dict["gps"], self.gps.toDict())
+        self.assertEqual(group_dict["gps"], [45.5, -122.6])
         self.assertEqual(group_dict["media_keys"], self.media_keys)
 
     def test_group_from_dict(self):
@@ -29,6 +32,20 @@ class TestMediaGroupsGroup(unittest.TestCase):
         self.assertEqual(restored.gps.longitude, original.gps.longitude)
         self.assertEqual(restored.media_keys, original.media_keys)
 
+    def test_group_cartesian_sum_round_trip(self):
+        group = MediaGroups.Group(self.gps, self.media_keys, (0.5, -0.25, 1.5))
+        restored = MediaGroups.Group.fromDict(group.toDict())
+        self.assertEqual(restored.cartesian_sum, (0.5, -0.25, 1.5))
+
+    def test_group_from_dict_with_gps_dict(self):
+        # Test groups serialized with a GPS dictionary can still be read
+        group_dict = {"gps": self.gps.toDict(), "media_keys": self.media_keys}
+
+        restored = MediaGroups.Group.fromDict(group_dict)
+        self.assertEqual(restored.gps.latitude, 45.5)
+        self.assertEqual(restored.gps.longitude, -122.6)
+        self.assertEqual(restored.media_keys, self.media_keys)
+
 
 class TestMediaGroups(unittest.TestCase):
     def setUp(self):
@@ -77,6 +94,67 @@ class TestMediaGroups(unittest.TestCase):
         self.assertEqual(len(self.groups.groups), 1)
         self.assertEqual(len(self.groups.groups[0].media_keys), 2)
 
+    def test_add_locations_barycenter(self):
+        # Add locations of a single group, the group is located at their barycenter
+        close_locations = {
+            "file1.jpg": {"gps": {"latitude": 45.5, "longitude": -122.6}},
+            "file2.jpg": {"gps": {"latitude": 45.5, "longitude": -122.601}},
+            "file3.jpg": {"gps": {"latitude": 45.5, "longitude": -122.6005}},
+        }
+        expected = GPS.barycenter(
+            [GPS(45.5, -122.6), GPS(45.5, -122.601), GPS(45.5, -122.6005)]
+        )
+
+        self.groups.add_locations(close_locations)
+
+        self.assertEqual(len(self.groups.groups), 1)
+        self.assertAlmostEqual(self.groups.groups[0].gps.latitude, expected.latitude)
+        self.assertAlmostEqual(self.groups.groups[0].gps.longitude, expected.longitude)
+
+    def test_add_locations_bridging_groups(self):
+        # Add a location close to two existing groups, they are merged with it
+        self.groups.groups = [
+            MediaGroups.Group(GPS(45.5, -122.6), ["file1.jpg"]),
+            MediaGroups.Group(GPS(47.6, -122.3), ["file4.jpg"]),
+            MediaGroups.Group(GPS(45.5, -122.6016), ["file2.jpg", "file3.jpg"]),
+        ]
+        bridging_location = {
+            "file5.jpg": {"gps": {"latitude": 45.5, "longitude": -122.6008}}
+        }
+
+        self.groups.add_locations(bridging_location)
+
+        self.assertEqual(len(self.groups.groups), 2)
+        self.assertEqual(self.groups.groups[0].media_keys, ["file4.jpg"])
+        self.assertEqual(
+            sorted(self.groups.groups[1].media_keys),
+            ["file1.jpg", "file2.jpg", "file3.jpg", "file5.jpg"],
+        )
+
+    def test_add_locations_across_latitude_bands(self):
+        # Locations closer than the threshold are grouped even when they lie
+        # on both sides of a latitude band boundary
+        band_height = math.degrees(self.groups.grouping_threshold / EARTH_RADIUS)
+        boundary = 300 * band_height
+        locations = {
+            "north.jpg": {
+                "gps": {"latitude": boundary + 0.1 * band_height, "longitude": 0}
+            },
+            "far.jpg": {
+                "gps": {"latitude": boundary + 2.5 * band_height, "longitude": 0}
+            },
+            "south.jpg": {
+                "gps": {"latitude": boundary - 0.1 * band_height, "longitude": 0}
+            },
+        }
+
+        self.groups.add_locations(locations)
+
+        self.assertEqual(
+            [group.media_keys for group in self.groups.groups],
+            [["far.jpg"], ["north.jpg", "south.jpg"]],
+        )
+
     def test_add_locations_separate_groups(self):
         # Add locations that should create separate groups
         self.groups.add_locations(self.locations)
@@ -109,6 +187,15 @@ class TestMediaGroups(unittest.TestCase):
             self.assertEqual(orig_group.gps.longitude, rest_group.gps.longitude)
             self.assertEqual(orig_group.media_keys, rest_group.media_keys)
 
+    def test_write_json(self):
+        # Test the written document is the JSON form of toDict
+        self.groups.add_locations(self.locations)
+        for groups in (self.groups, MediaGroups(self.threshold)):
+            with self.subTest(groups=len(groups.groups)):
+                output = io.StringIO()
+                groups.write_json(output)
+                self.assertEqual(output.getvalue(), json.dumps(groups.toDict()))
+
     def test_add_locations_with_invalid_gps(self):
         # Test with invalid GPS coordinates
         invalid_locations = {
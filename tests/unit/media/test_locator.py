@@ -1,11 +1,17 @@
 import os
+import json
 import shutil
+import hashlib
 import tempfile
 import unittest
 from pathlib import Path
 from unittest.mock import Mock, patch
 from medialocate.media.locator import MediaType, DataTag, MediaLocateAction
 from medialocate.location.gps import GPS
+from medialocate.util.file_naming import (
+    LEGACY_HASH_MIGRATED_SUFFIX,
+    get_hash_from_relative_path,
+)
 
 
 class TestMediaType(unittest.TestCase):
@@ -121,7 +127,9 @@ class TestMediaLocateAction(unittest.TestCase):
 
         # Verify ExifTool was called correctly
         mock_exiftool_instance.get_tags.assert_called_once_with(
-            test_file, tags=["Composite:GPSLatitude", "Composite:GPSLongitude"]
+            test_file,
+            tags=["Composite:GPSLatitude", "Composite:GPSLongitude"],
+            params="-fast2",
         )
 
     @patch("medialocate.media.locator.ExifToolHelper")
@@ -137,9 +145,121 @@ class TestMediaLocateAction(unittest.TestCase):
 
         # Verify ExifTool was called
         mock_exiftool_instance.get_tags.assert_called_once_with(
-            test_file, tags=["Composite:GPSLatitude", "Composite:GPSLongitude"]
+            test_file,
+            tags=["Composite:GPSLatitude", "Composite:GPSLongitude"],
+            params="-fast2",
         )
 
+    @patch("medialocate.media.locator.ExifToolHelper")
+    def test_get_gps_data_read_without_exiftool(self, mock_exiftool_class):
+        # Arrange
+        test_file = os.path.join(self.test_files_dirname, "movie.mp4")
+        with patch(
+            "medialocate.media.locator.read_gps", return_value=(45.5, -122.6)
+        ) as mock_read_gps:
+            # Act
+            gps = self.action.get_gps_data(test_file)
+
+        # Assert
+        mock_read_gps.assert_called_once_with(test_file, "mp4")
+        self.assertEqual(gps.latitude, 45.5)
+        self.assertEqual(gps.longitude, -122.6)
+        mock_exiftool_class.assert_not_called()
+
+    @patch("medialocate.media.locator.ExifToolHelper")
+    def test_prepare_extracts_gps_data_at_once(self, mock_exiftool_class):
+        # Setup mock ExifTool instance
+        picture = os.path.join(self.test_files_dirname, "picture.jpg")
+        movie = os.path.join(self.test_files_dirname, "movie.mp4")
+        mock_exiftool_instance = Mock()
+        mock_exiftool_instance.get_tags.return_value = [
+            {
+                "SourceFile": os.path.join(os.curdir, picture),
+                "Composite:GPSLatitude": 45.5,
+                "Composite:GPSLongitude": -122.6,
+            },
+            {"SourceFile": os.path.join(os.curdir, movie)},
+        ]
+        mock_exiftool_class.return_value = mock_exiftool_instance
+
+        with patch.object(
+            self.action, "_get_third_party_path", return_value="exiftool"
+        ):
+            self.action.prepare([picture, movie])
+            gps = self.action.get_gps_data(os.path.join(os.curdir, picture))
+            with self.assertRaises(MediaLocateAction.GPSExtractionError):
+                self.action.get_gps_data(os.path.join(os.curdir, movie))
+
+        self.assertEqual(gps.latitude, 45.5)
+        self.assertEqual(gps.longitude, -122.6)
+        # Verify ExifTool was called once for the pictures and once for the movies
+        self.assertEqual(mock_exiftool_instance.get_tags.call_count, 2)
+        mock_exiftool_instance.get_tags.assert_any_call(
+            [os.path.join(os.curdir, picture)],
+            tags=["Composite:GPSLatitude", "Composite:GPSLongitude"],
+            params="-fast2",
+        )
+        mock_exiftool_instance.get_tags.assert_any_call(
+            [os.path.join(os.curdir, movie)],
+            tags=["Composite:GPSLatitude", "Composite:GPSLongitude"],
+            params="-fast",
+        )
+
+    @patch("medialocate.media.locator.ExifToolHelper")
+    def test_prepare_reads_gps_data_before_exiftool(self, mock_exiftool_class):
+        # Arrange
+        picture = os.path.join(self.test_files_dirname, "picture.jpg")
+        movie = os.path.join(self.test_files_dirname, "movie.mp4")
+        mock_exiftool_instance = Mock()
+        mock_exiftool_instance.get_tags.return_value = []
+        mock_exiftool_class.return_value = mock_exiftool_instance
+
+        def read_gps(path, media_format):
+            return (45.5, -122.6) if media_format == "jpg" else None
+
+        # Act
+        with patch("medialocate.media.locator.read_gps", side_effect=read_gps):
+            with patch.object(
+                self.action, "_get_third_party_path", return_value="exiftool"
+            ):
+                self.action.prepare([picture, movie])
+            gps = self.action.get_gps_data(os.path.join(os.curdir, picture))
+
+        # Assert
+        self.assertEqual(gps.latitude, 45.5)
+        self.assertEqual(gps.longitude, -122.6)
+        mock_exiftool_instance.get_tags.assert_called_once_with(
+            [os.path.join(os.curdir, movie)],
+            tags=["Composite:GPSLatitude", "Composite:GPSLongitude"],
+            params="-fast",
+        )
+
+    @patch("medialocate.media.locator.ThreadPoolExecutor")
+    @patch("medialocate.media.locator.ExifToolHelper")
+    def test_prepare_single_read_worker(self, mock_exiftool_class, mock_executor):
+        # Arrange
+        action = MediaLocateAction(
+            self.test_working_dirname, self.out_filename, read_workers=1
+        )
+        picture = os.path.join(self.test_files_dirname, "picture.jpg")
+        movie = os.path.join(self.test_files_dirname, "movie.mp4")
+        mock_exiftool_class.return_value.get_tags.return_value = []
+
+        # Act
+        with patch("medialocate.media.locator.read_gps", return_value=None):
+            with patch.object(action, "_get_third_party_path", return_value="exiftool"):
+                action.prepare([picture, movie])
+
+        # Assert
+        mock_executor.assert_not_called()
+
+    @patch("medialocate.media.locator.ExifToolHelper")
+    def test_get_gps_data_skips_gps_less_formats(self, mock_exiftool_class):
+        test_file = os.path.join(self.test_files_dirname, "animation.gif")
+        with self.assertRaises(MediaLocateAction.GPSExtractionError):
+            self.action.get_gps_data(test_file)
+        mock_exiftool_class.return_value.get_tags.assert_not_called()
+
     def test_get_expected_extensions(self):
         extensions = self.action.get_expected_extensions()
         expected = [
@@ -170,6 +290,9 @@ class TestMediaLocateAction(unittest.TestCase):
 
         self.action.generate_thumbnail(source, thumb)
         mock_run.assert_called_once()
+        command = mock_run.call_args[0][0]
+        self.assertNotIn("-skip_frame", command)
+        self.assertIn("scale=w=128:h=-1", command)
 
     @patch("subprocess.run")
     def test_generate_thumbnail_movie(self, mock_run):
@@ -180,6 +303,153 @@ class TestMediaLocateAction(unittest.TestCase):
 
         self.action.generate_thumbnail(source, thumb)
         mock_run.assert_called_once()
+        command = mock_run.call_args[0][0]
+        self.assertLess(command.index("-skip_frame"), command.index("-i"))
+        self.assertIn("thumbnail,scale=w=128:h=-1", command)
+
+    @patch("shutil.which", return_value=None)
+    def test_get_third_party_path_not_found(self, mock_which):
+        # Act
+        first_path = self.action._get_third_party_path("ffmpeg")
+        second_path = self.action._get_third_party_path("ffmpeg")
+
+        # Assert
+        self.assertIsNone(first_path)
+        self.assertIsNone(second_path)
+        mock_which.assert_called_once_with("ffmpeg")
+
+    def test_write_data_appendix(self):
+        # Arrange
+        self.action.store.set("test_hash", {"mediaformat": "jpg"})
+        self.action.store.sync()
+        with open(self.action.store.get_path(), "rb") as f:
+            store_content = f.read()
+
+        # Act
+        self.action.write_data_appendix()
+
+        # Assert
+        with open(self.action.data_appendix_path, "rb") as f:
+            self.assertEqual(f.read(), b"medialocate_data=" + store_content + b";")
+
+    @patch("medialocate.media.locator._SENDFILE_TO_FILE", True)
+    @patch("medialocate.media.locator.os.sendfile", create=True)
+    def test_write_data_appendix_sendfile_error(self, mock_sendfile):
+        # Arrange
+        mock_sendfile.side_effect = OSError("Socket operation on non-socket")
+        self.action.store.set("test_hash", {"mediaformat": "jpg"})
+        self.action.store.sync()
+        with open(self.action.store.get_path(), "rb") as f:
+            store_content = f.read()
+
+        # Act
+        self.action.write_data_appendix()
+
+        # Assert
+        mock_sendfile.assert_called_once()
+        with open(self.action.data_appendix_path, "rb") as f:
+            self.assertEqual(f.read(), b"medialocate_data=" + store_content + b";")
+
+    @patch("medialocate.media.locator._SENDFILE_TO_FILE", False)
+    @patch("medialocate.media.locator.os.sendfile", create=True)
+    def test_write_data_appendix_without_sendfile(self, mock_sendfile):
+        # Arrange
+        self.action.store.set("test_hash", {"mediaformat": "jpg"})
+        self.action.store.sync()
+        with open(self.action.store.get_path(), "rb") as f:
+            store_content = f.read()
+
+        # Act
+        self.action.write_data_appendix()
+
+        # Assert
+        mock_sendfile.assert_not_called()
+        with open(self.action.data_appendix_path, "rb") as f:
+            self.assertEqual(f.read(), b"medialocate_data=" + store_content + b";")
+
+    def test_migrate_legacy_keys_once(self):
+        # Arrange
+        source = "test_files/picture.jpg"
+        legacy_key = hashlib.md5(source.encode("utf-8")).hexdigest()
+        new_key = get_hash_from_relative_path(source)
+        legacy_thumb = os.path.join(self.test_working_dirname, f"{legacy_key}.jpg")
+        Path(legacy_thumb).touch()
+        self.action.store.set(legacy_key, {"mediasource": source})
+        self.action.store.set("no_source", {"mediaformat": "jpg"})
+
+        # Act
+        self.action._migrate_legacy_keys()
+        self.action.store.set(legacy_key, {"mediasource": source})
+        self.action._migrate_legacy_keys()
+
+        # Assert
+        self.assertIn(new_key, self.action.store)
+        self.assertIn(legacy_key, self.action.store)
+        self.assertIn("no_source", self.action.store)
+        self.assertTrue(
+            os.path.exists(os.path.join(self.test_working_dirname, f"{new_key}.jpg"))
+        )
+        self.assertFalse(os.path.exists(legacy_thumb))
+
+    def test_migrate_legacy_keys_then_create_location_page(self):
+        # Arrange
+        source = "test_files/picture.jpg"
+        legacy_key = hashlib.md5(source.encode("utf-8")).hexdigest()
+        new_key = get_hash_from_relative_path(source)
+        legacy_thumb = os.path.join(self.test_working_dirname, f"{legacy_key}.jpg")
+        Path(legacy_thumb).touch()
+        self.action.terminate()
+        with open(self.action.store.get_path(), "w") as f:
+            json.dump(
+                {
+                    legacy_key: {
+                        "mediasource": source,
+                        "mediathumbnail": f"{self.test_working_dirname}/"
+                        f"{legacy_key}.jpg",
+                    }
+                },
+                f,
+            )
+
+        # Act
+        self.action = MediaLocateAction(self.test_working_dirname, self.out_filename)
+        page = self.action.create_location_page()
+
+        # Assert
+        self.assertIsNotNone(page)
+        with open(self.action.data_appendix_path, "r") as f:
+            data_script = f.read()
+        self.assertIn(f"{new_key}.jpg", data_script)
+        self.assertNotIn(legacy_key, data_script)
+        self.assertTrue(
+            os.path.exists(self.action.store.get_path() + LEGACY_HASH_MIGRATED_SUFFIX)
+        )
+
+    def test_migrate_legacy_keys_skips_empty_store(self):
+        # Assert
+        self.assertFalse(
+            os.path.exists(self.action.store.get_path() + LEGACY_HASH_MIGRATED_SUFFIX)
+        )
+
+    def test_create_thumb_from_media_skips_fresh_thumbnail(self):
+        # Arrange
+        source = os.path.join(self.test_files_dirname, "picture.jpg")
+        thumb = os.path.join(self.test_working_dirname, "thumb.jpg")
+        Path(thumb).touch()
+        source_mtime = os.path.getmtime(source)
+
+        with patch.object(self.action, "generate_thumbnail") as mock_thumb:
+            # Act
+            os.utime(thumb, (source_mtime, source_mtime))
+            fresh = self.action.create_thumb_from_media(
+                source, MediaType.PICTURE, thumb
+            )
+            os.utime(thumb, (source_mtime - 10, source_mtime - 10))
+            self.action.create_thumb_from_media(source, MediaType.PICTURE, thumb)
+
+        # Assert
+        self.assertTrue(fresh)
+        mock_thumb.assert_called_once_with(source, thumb)
 
     def test_process_valid_file(self):
         test_file = os.path.join(self.test_files_dirname, "picture.jpg")
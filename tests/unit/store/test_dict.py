@@ -166,6 +166,43 @@ class TestDictStore(unittest.TestCase):
         self.assertEqual(store._store[item3_key], item3_value_y)
         self.assertEqual(store._touched, True)
 
+    def test_update_items_with_existing_store_file(self):
+        """Test update several items at once with existing store file"""
+        # Arrange
+        item1_key = "key1"
+        item1_value = {"value": "value1"}
+        item2_key = "key2"
+        item2_value = {"value": "value2"}
+        data = {item1_key: item1_value}
+        with open(self.store_path, "w") as f:
+            json.dump(data, f)
+        store = DictStore(self.store_dir, self.store_name)
+        store.open()
+
+        # Act
+        store.update({item1_key: item1_value, item2_key: item2_value})
+
+        # Assert
+        self.assertEqual(store._store[item1_key], item1_value)
+        self.assertEqual(store._store[item2_key], item2_value)
+        self.assertEqual(store._touched, True)
+
+    def test_update_items_unchanged(self):
+        """Test update items with unchanged values does not touch the store"""
+        # Arrange
+        item1_key = "key1"
+        item1_value = {"value": "value1"}
+        with open(self.store_path, "w") as f:
+            json.dump({item1_key: item1_value}, f)
+        store = DictStore(self.store_dir, self.store_name)
+        store.open()
+
+        # Act
+        store.update({item1_key: {"value": "value1"}})
+
+        # Assert
+        self.assertEqual(store._touched, False)
+
     def test_commit_without_update(self):
         """Test commit without update"""
         # Arrange
@@ -4,6 +4,7 @@ from medialocate.util.file_naming import (
     relative_path_to_posix,
     relative_path_to_uri,
     get_hash_from_relative_path,
+    get_legacy_hash_from_relative_path,
     get_extension,
 )
 
@@ -15,8 +16,8 @@ class TestFileNaming(unittest.TestCase):
         self.mixed_relative_path = "Users\\test/file.txt"
         self.expected_relative_path = self.posix_relative_path
         self.expected_relative_uri = self.posix_relative_path
-        self.expected_relative_hash = hashlib.md5(
-            self.posix_relative_path.encode("utf-8"), usedforsecurity=False
+        self.expected_relative_hash = hashlib.blake2b(
+            self.posix_relative_path.encode("utf-8"), digest_size=16
         ).hexdigest()
         self.absolute_paths = [
             "C:\\Users\\test\\file.txt",
@@ -131,8 +132,8 @@ class TestFileNaming(unittest.TestCase):
         # Test hash generation with special characters in relative paths
         for path, expected in self.special_char_paths.items():
             with self.subTest(path=path):
-                expected_hash = hashlib.md5(
-                    path.encode("utf-8"), usedforsecurity=False
+                expected_hash = hashlib.blake2b(
+                    path.encode("utf-8"), digest_size=16
                 ).hexdigest()
                 self.assertEqual(get_hash_from_relative_path(path), expected_hash)
 
@@ -166,6 +167,18 @@ class TestFileNaming(unittest.TestCase):
                 ):
                     get_hash_from_relative_path(input_path)
 
+    def test_get_legacy_hash_from_relative_path_with_posix_relative_path(self):
+        # Test legacy hash generation keeps the former MD5 keys
+        # Arrange
+        expected_hash = hashlib.md5(
+            self.posix_relative_path.encode("utf-8"), usedforsecurity=False
+        ).hexdigest()
+        # Act
+        result = get_legacy_hash_from_relative_path(self.posix_relative_path)
+        # Assert
+        self.assertEqual(result, expected_hash)
+        self.assertEqual(len(result), len(self.expected_relative_hash))
+
     def test_relative_path_to_uri_with_windows_relative_path(self):
         # Test URI conversion with Windows relative paths
         # Act